@@ -40,4 +40,61 @@ DEFAULT_ADMIN_PASSWORD = "admin123"
 # Application settings
 APP_NAME = "Auto Click"
 APP_ICON = "input-mouse"
-DATABASE_FILE = "autoclick.db"
\ No newline at end of file
+DATABASE_FILE = "autoclick.db"
+
+# Image recognition settings
+PYRAMID_LEVELS = 2  # Each level halves the screen and template size
+PYRAMID_CANDIDATES = 3  # Coarse peaks refined at full resolution
+PYRAMID_MIN_TEMPLATE_SIZE = 8  # Smallest template side allowed at the coarsest level
+LOCATION_PRIOR_MARGIN = 50  # Pixels searched around a template's last hit before a full scan
+ANCHOR_VERIFY_MARGIN = 4  # Pixels an anchor may drift before its cached location is re-searched
+NMS_OVERLAP = 0.3  # Matches overlapping a better one by more than this are dropped
+DOWNSCALED_MATCH_FACTOR = 2  # Shrink factor for templates loaded in 'downscaled' mode
+FEATURE_DETECTOR = 'orb'  # 'orb' or 'akaze', used by templates loaded in 'features' mode
+FEATURE_MAX_KEYPOINTS = 2000  # Keypoints detected per template and per screen tile
+FEATURE_TILE_SIZE = 256  # Side, in pixels, of the screen tiles keypoints are detected in
+FEATURE_PATCH_SIZE = 15  # ORB patch size and edge threshold; small enough for button-sized templates
+FEATURE_RATIO = 0.75  # Lowe ratio test threshold for descriptor matches
+FEATURE_MIN_MATCHES = 8  # Homography inliers needed to accept a feature match
+PREFILTER_MEAN_TOLERANCE = 40  # Max per-channel mean difference for a window to survive the prefilter
+PREFILTER_STD_RATIO = 2.0  # Max ratio between window and template contrast in the prefilter
+AUTO_CROP_TOLERANCE = 8  # Max color difference from the border for a margin to count as uniform
+AUTO_CROP_MAX_SIDE = 96  # Auto-cropped templates longer than this keep only their most varied window
+WAIT_MIN_INTERVAL = 0.02  # Seconds between polls right after the screen changed
+WAIT_MAX_INTERVAL = 0.5  # Longest poll interval while the screen stays static
+WAIT_BACKOFF = 1.5  # Poll interval growth factor per unchanged frame
+
+# Screen capture settings
+FRAME_CACHE_MAX_AGE = 0.1  # Seconds a shared screen capture stays valid
+CAPTURE_BACKEND = 'auto'  # 'auto', 'mss' or 'pyautogui'
+CHANGE_TILE_SIZE = 64  # Screen tile side, in pixels, used for change detection
+
+# Pixel check settings
+PIXEL_TOLERANCE = 10  # Default per-channel color tolerance for pixel checks
+PIXEL_POLL_INTERVAL = 0.02  # Seconds between frames while waiting on pixel checks
+
+# Anchor capture settings
+ANCHOR_PATCH_SIZE = 48  # Side, in pixels, of the patch grabbed around a recorded click
+ANCHOR_MIN_CONTRAST = 12.0  # Patches flatter than this (gray std) are too plain to anchor on
+PATCH_HASH_DISTANCE = 4  # Max differing hash bits for two patches to be compared pixel by pixel
+PATCH_MATCH_MSE = 10.0  # Max mean squared pixel error for a new patch to reuse a stored one
+
+# Trigger watcher settings
+WATCHER_INTERVAL = 0.1  # Seconds between screen checks for profile triggers
+STABLE_REGION_MS = 500  # Default time a region must stay unchanged for a 'stable' trigger
+
+# Stability wait settings
+STABILITY_SAMPLE_STEP = 4  # Frames are shrunk by this factor before differencing
+STABILITY_THRESHOLD = 8  # Gray-level change a sample must exceed to count as screen activity
+STABILITY_REGION_SIZE = 300  # Side of the area around the next click that an inserted wait watches
+
+# Checkpoint settings
+CHECKPOINT_HASH_SIZE = 16  # Checkpoints store a 16 x 16 = 256 bit difference hash
+CHECKPOINT_MAX_DISTANCE = 20  # Upper limit of the default tolerance, in differing hash bits
+CHECKPOINT_REGION_SIZE = 400  # Side of the area around the cursor that a recorded checkpoint hashes
+CHECKPOINT_MIN_CHANGE = (300, 150)  # Smallest change, e.g. a dialog, the default tolerance must catch
+CHECKPOINT_CHANGE_FRACTION = 0.25  # Share of the hash bits under such a change allowed to differ
+
+# Playback timing settings
+SCHEDULER_SPIN_MS = 1.0  # Busy-wait this long before each action deadline instead of sleeping
+INPUT_BACKEND = 'pyautogui'  # 'pyautogui', 'pynput', 'xtest' or 'null'; profiles can override it
\ No newline at end of file
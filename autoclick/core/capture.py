@@ -0,0 +1,123 @@
+"""
+Screen capture backends for the Auto Click application.
+"""
+import threading
+
+import cv2
+import numpy as np
+import pyautogui
+
+try:
+    import mss
+except ImportError:
+    mss = None
+
+class CaptureBackend:
+    """Base class for screen capture backends.
+    
+    grab() returns a uint8 array in BGR or BGRA channel order, indexed [y, x].
+    """
+    name = None
+    
+    def grab(self, region=None):
+        raise NotImplementedError
+    
+    def close(self):
+        pass
+
+class PyAutoGUICapture(CaptureBackend):
+    """Portable fallback that goes through pyautogui's PIL screenshot."""
+    name = 'pyautogui'
+    
+    def grab(self, region=None):
+        screenshot = pyautogui.screenshot(region=region)
+        return cv2.cvtColor(np.asarray(screenshot), cv2.COLOR_RGB2BGR)
+
+class MSSCapture(CaptureBackend):
+    """Fast capture through mss (MIT-SHM/XGetImage on X11, GDI on Windows, CoreGraphics on macOS).
+    
+    Frames are BGRA views over the buffer mss returns, so no pixel data is copied.
+    """
+    name = 'mss'
+    
+    def __init__(self):
+        if mss is None:
+            raise RuntimeError("The mss package is required for the mss capture backend")
+        self.local = threading.local()  # mss handles must not be shared between threads
+    
+    def grab(self, region=None):
+        sct = getattr(self.local, 'sct', None)
+        if sct is None:
+            sct = self.local.sct = mss.mss()
+        
+        if region is None:
+            # The primary monitor, whose top-left is screen (0, 0) for pyautogui and for
+            # every consumer of frame coordinates; monitors[0] spans all monitors and may
+            # start at a negative origin
+            monitor = sct.monitors[1] if len(sct.monitors) > 1 else sct.monitors[0]
+        else:
+            left, top, width, height = region
+            monitor = {'left': int(left), 'top': int(top), 'width': int(width), 'height': int(height)}
+        
+        shot = sct.grab(monitor)
+        return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+    
+    def close(self):
+        sct = getattr(self.local, 'sct', None)
+        if sct is not None:
+            sct.close()
+            self.local.sct = None
+
+class SyntheticCapture(CaptureBackend):
+    """In-memory backend for headless tests.
+    
+    Serves the frames it was given in order and keeps returning the last one.
+    """
+    name = 'synthetic'
+    
+    def __init__(self, frames=None):
+        self.frames = list(frames or [])
+        self.index = 0
+        self.grab_count = 0
+    
+    def set_frame(self, frame):
+        """Replace the queued frames with a single frame."""
+        self.frames = [frame]
+        self.index = 0
+    
+    def push_frame(self, frame):
+        self.frames.append(frame)
+    
+    def grab(self, region=None):
+        if not self.frames:
+            raise RuntimeError("No synthetic frames available")
+        
+        frame = self.frames[self.index]
+        if self.index < len(self.frames) - 1:
+            self.index += 1
+        self.grab_count += 1
+        
+        if region is not None:
+            left, top, width, height = region
+            frame = frame[top:top + height, left:left + width]
+        return frame
+
+CAPTURE_BACKENDS = {
+    'pyautogui': PyAutoGUICapture,
+    'mss': MSSCapture,
+    'synthetic': SyntheticCapture
+}
+
+def get_capture_backend(name='auto'):
+    """Create a capture backend by name; 'auto' prefers mss when it is installed."""
+    if name == 'auto':
+        name = 'mss' if mss is not None else 'pyautogui'
+    if name not in CAPTURE_BACKENDS:
+        raise ValueError(f"Unknown capture backend: {name}")
+    return CAPTURE_BACKENDS[name]()
+
+def to_bgr(frame):
+    """Drop the alpha channel of a BGRA frame; BGR and grayscale frames are returned as is."""
+    if frame.ndim == 3 and frame.shape[2] == 4:
+        return cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+    return frame
\ No newline at end of file
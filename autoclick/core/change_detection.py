@@ -0,0 +1,160 @@
+"""
+Screen change detection for the Auto Click application.
+"""
+import threading
+
+import numpy as np
+
+from autoclick.config import CHANGE_TILE_SIZE
+
+_weights = {}  # (tile_size, words per tile row) -> odd 64-bit weights for block_signatures()
+
+def block_signatures(block, tile_size):
+    """Return one 64-bit signature per tile of a block whose sides are multiples of tile_size.
+    
+    Each signature is a sum of the tile's bytes, read as 64-bit words, times fixed
+    odd weights, wrapping around at 2**64. Any change confined to one word alters
+    it, and a wider change goes unnoticed only if it happens to cancel out exactly.
+    The words are read through a view of the block, so no tile is copied.
+    """
+    rows, cols = block.shape[0] // tile_size, block.shape[1] // tile_size
+    data = block.reshape(block.shape[0], -1)
+    if data.shape[1] % (8 * cols) == 0:
+        words = data.view(np.uint64)
+    else:
+        words = data.astype(np.uint64)
+    words = words.reshape(rows, tile_size, cols, -1)
+    
+    key = (tile_size, words.shape[3])
+    weights = _weights.get(key)
+    if weights is None:
+        weights = np.random.default_rng(key).integers(0, 2 ** 63, key, dtype=np.uint64)
+        weights = _weights[key] = weights * np.uint64(2) + np.uint64(1)
+    return np.einsum('rtck,tk->rc', words, weights)
+
+def tile_signatures(frame, tile_size=CHANGE_TILE_SIZE, tiles=None):
+    """Return a (rows, cols) array of signatures, one per tile_size x tile_size screen tile.
+    
+    tiles=(row0, col0, row1, col1) limits the work to that block of tiles. Tiles
+    cut off by the frame edge are zero-padded; see block_signatures() for how
+    the full-resolution pixels of each tile are summarised.
+    """
+    if frame.ndim == 2:
+        frame = frame[:, :, np.newaxis]
+    h, w, channels = frame.shape
+    t = tile_size
+    if tiles is None:
+        tiles = (0, 0, -(-h // t), -(-w // t))
+    row0, col0, row1, col1 = tiles
+    signatures = np.empty((row1 - row0, col1 - col0), np.uint64)
+    
+    # Complete tiles are read straight from the frame
+    full_rows = max(row0, min(row1, h // t))
+    full_cols = max(col0, min(col1, w // t))
+    if full_rows > row0 and full_cols > col0:
+        signatures[:full_rows - row0, :full_cols - col0] = block_signatures(
+            frame[row0 * t:full_rows * t, col0 * t:full_cols * t], t)
+    
+    # The ragged bottom and right strips are padded to whole tiles
+    for strip_rows, strip_cols in (((full_rows, row1), (col0, col1)), ((row0, full_rows), (full_cols, col1))):
+        if strip_rows[1] > strip_rows[0] and strip_cols[1] > strip_cols[0]:
+            part = frame[strip_rows[0] * t:strip_rows[1] * t, strip_cols[0] * t:strip_cols[1] * t]
+            strip = np.zeros(((strip_rows[1] - strip_rows[0]) * t, (strip_cols[1] - strip_cols[0]) * t, channels),
+                             frame.dtype)
+            strip[:part.shape[0], :part.shape[1]] = part
+            signatures[strip_rows[0] - row0:strip_rows[1] - row0,
+                       strip_cols[0] - col0:strip_cols[1] - col0] = block_signatures(strip, t)
+    return signatures
+
+class ChangeDetector:
+    """Remembers, for every screen tile, the id of the frame in which it last changed.
+    
+    update() only keeps a reference to the newest frame. A tile is hashed the
+    first time a query covers it in that frame, so queries about a small region
+    never pay for the rest of the screen. A change is dated to the frame in which
+    it was first seen, which may be later than when it happened; queries can
+    therefore report a change too eagerly but never miss one.
+    """
+    
+    def __init__(self, tile_size=CHANGE_TILE_SIZE):
+        self.tile_size = tile_size
+        self.frame = None
+        self.frame_id = None
+        self.signatures = None
+        self.checked = None  # Id of the frame each signature was taken from, -1 if never
+        self.last_changed = None
+        self.lock = threading.Lock()
+    
+    def update(self, frame, frame_id):
+        """Make frame the one later queries compare against; repeated frame ids are ignored."""
+        with self.lock:
+            if frame_id == self.frame_id:
+                return
+            t = self.tile_size
+            shape = (-(-frame.shape[0] // t), -(-frame.shape[1] // t))
+            if self.signatures is None or self.signatures.shape != shape:
+                self.signatures = np.zeros(shape, np.uint64)
+                self.checked = np.full(shape, -1, np.int64)
+                self.last_changed = np.full(shape, frame_id, np.int64)
+            self.frame = frame
+            self.frame_id = frame_id
+    
+    def track(self, frame_id, bounds):
+        """Hash the tiles inside bounds now, if frame_id is still the newest frame.
+        
+        Callers that cache a result for frame_id use this so that the next query
+        can compare against that exact frame instead of reporting a change.
+        """
+        with self.lock:
+            if frame_id == self.frame_id and self.frame is not None:
+                self._refresh(self._tile_range(bounds))
+    
+    def changed_bounds(self, since_frame_id, bounds):
+        """Return the (x0, y0, x1, y1) box of tiles inside bounds that changed after since_frame_id.
+        
+        Returns None when nothing inside bounds has changed.
+        """
+        with self.lock:
+            if self.frame is None:
+                return bounds
+            row0, col0, row1, col1 = self._tile_range(bounds)
+            if row1 <= row0 or col1 <= col0:
+                return None
+            self._refresh((row0, col0, row1, col1))
+            
+            x0, y0, x1, y1 = bounds
+            t = self.tile_size
+            tiles = self.last_changed[row0:row1, col0:col1]
+            rows, cols = np.nonzero(tiles > since_frame_id)
+            if rows.size == 0:
+                return None
+            return (max(x0, (col0 + int(cols.min())) * t), max(y0, (row0 + int(rows.min())) * t),
+                    min(x1, (col0 + int(cols.max()) + 1) * t), min(y1, (row0 + int(rows.max()) + 1) * t))
+    
+    def changed_since(self, since_frame_id, bounds):
+        return self.changed_bounds(since_frame_id, bounds) is not None
+    
+    def _tile_range(self, bounds):
+        x0, y0, x1, y1 = bounds
+        t = self.tile_size
+        rows, cols = self.signatures.shape
+        return (max(0, int(y0) // t), max(0, int(x0) // t),
+                min(rows, -(-int(y1) // t)), min(cols, -(-int(x1) // t)))
+    
+    def _refresh(self, tiles):
+        # Hash the tiles in the block that have not been hashed in the current frame yet
+        row0, col0, row1, col1 = tiles
+        stale = self.checked[row0:row1, col0:col1] != self.frame_id
+        rows, cols = np.nonzero(stale)
+        if rows.size == 0:
+            return
+        row0, col0 = row0 + int(rows.min()), col0 + int(cols.min())
+        row1, col1 = row0 + int(rows.max() - rows.min()) + 1, col0 + int(cols.max() - cols.min()) + 1
+        
+        block = (slice(row0, row1), slice(col0, col1))
+        stale = self.checked[block] != self.frame_id
+        signatures = tile_signatures(self.frame, self.tile_size, (row0, col0, row1, col1))
+        changed = stale & ((signatures != self.signatures[block]) | (self.checked[block] < 0))
+        self.last_changed[block][changed] = self.frame_id
+        self.signatures[block][stale] = signatures[stale]
+        self.checked[block][stale] = self.frame_id
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""
+Screen checkpoints for the Auto Click application.
+"""
+from autoclick.config import (CHECKPOINT_HASH_SIZE, CHECKPOINT_MAX_DISTANCE, CHECKPOINT_MIN_CHANGE,
+                              CHECKPOINT_CHANGE_FRACTION)
+from autoclick.core.frame_cache import get_frame_provider
+from autoclick.core.image_recognition import region_bounds
+from autoclick.core.patch_store import dhash
+
+CHECKPOINT_ACTIONS = ('abort', 'pause', 'continue', 'goto')  # What playback does when a checkpoint mismatches
+
+def screen_hash(frame, region=None, hash_size=CHECKPOINT_HASH_SIZE):
+    """Return the perceptual hash of a frame, or of its (left, top, width, height) region, as hex."""
+    x0, y0, x1, y1 = region_bounds(region, frame.shape)
+    value = dhash(frame[y0:y1, x0:x1], hash_size)
+    return f'{value:0{hash_size * hash_size // 4}x}'
+
+def hash_distance(hash_a, hash_b):
+    """Number of differing bits between two hex hashes."""
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count('1')
+
+def default_max_distance(width, height, hash_size=CHECKPOINT_HASH_SIZE):
+    """Return the hash distance a width x height checkpoint area tolerates by default.
+    
+    Each hash bit summarises an equal share of the area, so a change of a fixed
+    size (CHECKPOINT_MIN_CHANGE) flips fewer bits the larger the area is. The
+    tolerance is CHECKPOINT_CHANGE_FRACTION of the bits such a change covers,
+    capped at CHECKPOINT_MAX_DISTANCE and never below one bit.
+    """
+    change_w, change_h = CHECKPOINT_MIN_CHANGE
+    covered = min(1.0, change_w / max(1, width)) * min(1.0, change_h / max(1, height))
+    distance = int(hash_size * hash_size * covered * CHECKPOINT_CHANGE_FRACTION)
+    return max(1, min(CHECKPOINT_MAX_DISTANCE, distance))
+
+def capture_checkpoint(region=None, frame_provider=None):
+    """Hash the current screen (or region) into the fields of a 'checkpoint' action."""
+    frame = (frame_provider or get_frame_provider()).get_bgr_frame()
+    x0, y0, x1, y1 = region_bounds(region, frame.shape)
+    checkpoint = {'hash': screen_hash(frame, region), 'max_distance': default_max_distance(x1 - x0, y1 - y0)}
+    if region is not None:
+        checkpoint['region'] = list(region)
+    return checkpoint
+
+def check_checkpoint(action, frame_provider=None):
+    """Compare the current screen with a checkpoint action; returns (matched, distance)."""
+    frame = (frame_provider or get_frame_provider()).get_bgr_frame()
+    # Hash at the size the checkpoint was recorded with
+    hash_size = int(round((len(action['hash']) * 4) ** 0.5))
+    distance = hash_distance(screen_hash(frame, action.get('region'), hash_size), action['hash'])
+    max_distance = action.get('max_distance')
+    if max_distance is None:
+        x0, y0, x1, y1 = region_bounds(action.get('region'), frame.shape)
+        max_distance = default_max_distance(x1 - x0, y1 - y0, hash_size)
+    return distance <= max_distance, distance
\ No newline at end of file
@@ -0,0 +1,108 @@
+"""
+Script compilation for the Auto Click application.
+"""
+import numpy as np
+
+# Opcode of each action type; the order is the index into PlaybackThread's dispatch table.
+# Anything else compiles to OP_OTHER and keeps its dict in the extras table.
+OPCODES = ('click', 'move', 'keypress', 'keydown', 'keyup', 'scroll',
+           'anchor_click', 'wait_stable', 'checkpoint', 'other')
+(OP_CLICK, OP_MOVE, OP_KEYPRESS, OP_KEYDOWN, OP_KEYUP, OP_SCROLL,
+ OP_ANCHOR_CLICK, OP_WAIT_STABLE, OP_CHECKPOINT, OP_OTHER) = range(len(OPCODES))
+
+# Actions whose parameters do not fit the fixed columns keep them in the extras table
+EXTRA_OPCODES = (OP_ANCHOR_CLICK, OP_WAIT_STABLE, OP_CHECKPOINT, OP_OTHER)
+
+# Fields an action must have to compile to its own opcode
+REQUIRED_FIELDS = {
+    OP_CLICK: ('x', 'y'),
+    OP_MOVE: ('x', 'y'),
+    OP_KEYPRESS: ('key',),
+    OP_KEYDOWN: ('key',),
+    OP_KEYUP: ('key',),
+    OP_SCROLL: ('amount',),
+    OP_ANCHOR_CLICK: ('template',)
+}
+
+class CompiledScript:
+    """A script as parallel arrays, one entry per action.
+    
+    times holds each action's script time in seconds. x and y hold click and
+    move coordinates. arg holds the scroll amount, or an index into strings (key
+    and button names) or into extras (the original dicts of actions that need
+    more than the fixed columns).
+    """
+    
+    def __init__(self, opcodes, times, x, y, arg, button, strings, extras):
+        self.opcodes = opcodes
+        self.times = times
+        self.x = x
+        self.y = y
+        self.arg = arg
+        self.button = button
+        self.strings = strings
+        self.extras = extras
+    
+    def __len__(self):
+        return len(self.opcodes)
+    
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in (self.opcodes, self.times, self.x, self.y, self.arg, self.button))
+
+def compile_script(actions):
+    """Compile a list of action dicts into a CompiledScript.
+    
+    Actions that are missing required fields or hold invalid values compile to
+    OP_OTHER, which playback skips, and an error is printed for each of them.
+    """
+    count = len(actions)
+    opcodes = np.empty(count, np.uint8)
+    times = np.zeros(count, np.float64)
+    x = np.zeros(count, np.int32)
+    y = np.zeros(count, np.int32)
+    arg = np.zeros(count, np.int32)
+    button = np.zeros(count, np.int32)
+    strings = []
+    string_ids = {}
+    extras = []
+    
+    def intern(value):
+        index = string_ids.get(value)
+        if index is None:
+            index = string_ids[value] = len(strings)
+            strings.append(value)
+        return index
+    
+    for i, action in enumerate(actions):
+        try:
+            times[i] = action.get('time', 0.0)
+            action_type = action['type']
+            opcode = OPCODES.index(action_type) if action_type in OPCODES else OP_OTHER
+            for field in REQUIRED_FIELDS.get(opcode, ()):
+                if field not in action:
+                    raise ValueError(f"{action_type} action has no '{field}'")
+            
+            if opcode in EXTRA_OPCODES:
+                arg[i] = len(extras)
+                extras.append(action)
+            elif opcode == OP_SCROLL:
+                arg[i] = action['amount']
+            elif opcode in (OP_KEYPRESS, OP_KEYDOWN, OP_KEYUP):
+                arg[i] = intern(action['key'])
+            
+            if opcode in (OP_CLICK, OP_MOVE, OP_ANCHOR_CLICK) and 'x' in action:
+                x[i] = action['x']
+                y[i] = action['y']
+            if opcode in (OP_CLICK, OP_ANCHOR_CLICK):
+                button[i] = intern(action.get('button', 'left'))
+        except (KeyError, TypeError, ValueError, OverflowError, AttributeError) as e:
+            print(f"Error compiling action {i}: {e}")
+            opcode = OP_OTHER
+            x[i] = y[i] = arg[i] = button[i] = 0
+            if not extras or extras[-1] is not action:
+                extras.append(action)
+            arg[i] = len(extras) - 1
+        opcodes[i] = opcode
+    
+    return CompiledScript(opcodes, times, x, y, arg, button, strings, extras)
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+Shared screen capture cache for the Auto Click application.
+"""
+import threading
+import time
+
+from autoclick.config import FRAME_CACHE_MAX_AGE, CAPTURE_BACKEND
+from autoclick.core.capture import get_capture_backend, to_bgr
+
+class FrameProvider:
+    """Holds the latest screen capture and hands it to every consumer until it goes stale."""
+    
+    def __init__(self, max_age=FRAME_CACHE_MAX_AGE, backend=None):
+        self.max_age = max_age
+        self.backend = backend or get_capture_backend(CAPTURE_BACKEND)
+        self.frame = None
+        self.bgr_frame = None  # Three-channel copy of frame, made on demand
+        self.frame_time = 0
+        self.frame_id = 0  # Increments on every new capture
+        self.lock = threading.Lock()
+    
+    def get_frame(self, max_age=None):
+        """Return the cached BGR(A) frame, capturing a new one if it is older than max_age seconds.
+        
+        The returned array is shared and read-only; copy it before modifying.
+        """
+        with self.lock:
+            self._refresh(max_age)
+            return self.frame
+    
+    def get_bgr_frame(self, max_age=None):
+        """Like get_frame, but always three channels for matching against BGR templates."""
+        return self.get_bgr_snapshot(max_age)[0]
+    
+    def get_bgr_snapshot(self, max_age=None):
+        """Return (bgr_frame, frame_id) so callers can tell whether two frames are the same capture."""
+        with self.lock:
+            self._refresh(max_age)
+            if self.bgr_frame is None:
+                self.bgr_frame = self._readonly(to_bgr(self.frame))
+            return self.bgr_frame, self.frame_id
+    
+    def get_pixel(self, x, y, max_age=None):
+        """Return the (r, g, b) color of a screen pixel from the cached frame, or None off the frame."""
+        frame = self.get_frame(max_age)
+        h, w = frame.shape[:2]
+        if not (0 <= x < w and 0 <= y < h):
+            return None
+        b, g, r = frame[y, x][:3]
+        return int(r), int(g), int(b)
+    
+    def invalidate(self):
+        """Force the next consumer to capture a fresh frame."""
+        with self.lock:
+            self.frame = None
+            self.bgr_frame = None
+    
+    def _refresh(self, max_age):
+        if max_age is None:
+            max_age = self.max_age
+        if self.frame is None or time.monotonic() - self.frame_time > max_age:
+            self.frame = self._readonly(self.backend.grab())
+            self.bgr_frame = None
+            self.frame_time = time.monotonic()
+            self.frame_id += 1
+    
+    def _readonly(self, frame):
+        frame = frame.view()
+        frame.flags.writeable = False
+        return frame
+
+_frame_provider = None
+
+def get_frame_provider():
+    """Return the application-wide frame provider."""
+    global _frame_provider
+    if _frame_provider is None:
+        _frame_provider = FrameProvider()
+    return _frame_provider
\ No newline at end of file
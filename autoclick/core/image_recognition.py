@@ -1,43 +1,913 @@
 """
 Image recognition functionality for the Auto Click application.
 """
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
 import cv2
 import numpy as np
-import pyautogui
+
+from autoclick.config import (PYRAMID_LEVELS, PYRAMID_CANDIDATES, PYRAMID_MIN_TEMPLATE_SIZE,
+                              LOCATION_PRIOR_MARGIN, ANCHOR_VERIFY_MARGIN, NMS_OVERLAP, WAIT_MIN_INTERVAL,
+                              WAIT_MAX_INTERVAL, WAIT_BACKOFF, DOWNSCALED_MATCH_FACTOR, FEATURE_DETECTOR,
+                              FEATURE_MAX_KEYPOINTS, FEATURE_RATIO, FEATURE_MIN_MATCHES, FEATURE_PATCH_SIZE,
+                              FEATURE_TILE_SIZE, PREFILTER_MEAN_TOLERANCE, PREFILTER_STD_RATIO, AUTO_CROP_TOLERANCE,
+                              AUTO_CROP_MAX_SIDE)
+from autoclick.core.frame_cache import get_frame_provider
+from autoclick.core.change_detection import ChangeDetector
+from autoclick.core.shared_frames import SharedFrame, attach_shared_frame
+
+def downscale(image, scale):
+    """Shrink an image by an integer factor using area interpolation."""
+    h, w = image.shape[:2]
+    return cv2.resize(image, (max(1, w // scale), max(1, h // scale)), interpolation=cv2.INTER_AREA)
+
+def region_bounds(region, shape):
+    """Convert a (left, top, width, height) region into clipped (x0, y0, x1, y1) bounds."""
+    screen_h, screen_w = shape[:2]
+    if region is None:
+        return 0, 0, screen_w, screen_h
+    left, top, width, height = region
+    x0 = min(max(0, int(left)), screen_w)
+    y0 = min(max(0, int(top)), screen_h)
+    x1 = min(max(x0, int(left + width)), screen_w)
+    y1 = min(max(y0, int(top + height)), screen_h)
+    return x0, y0, x1, y1
+
+def region_around(x, y, size):
+    """Return a size x size (left, top, width, height) region centered on (x, y), clamped at 0."""
+    half = size // 2
+    return [max(0, int(x) - half), max(0, int(y) - half), size, size]
+
+def usable_pyramid_levels(template, levels):
+    """Reduce the pyramid depth until the template stays large enough to match."""
+    h, w = template.shape[:2]
+    while levels > 0 and min(h, w) >> levels < PYRAMID_MIN_TEMPLATE_SIZE:
+        levels -= 1
+    return levels
+
+def match_template(screen, template, mask=None):
+    """Run TM_CCOEFF_NORMED and return the best (score, top-left location)."""
+    if screen.shape[0] < template.shape[0] or screen.shape[1] < template.shape[1]:
+        return -1.0, None
+    result = cv2.matchTemplate(screen, template, cv2.TM_CCOEFF_NORMED, mask=mask)
+    if mask is not None:
+        # Masked correlation can divide by zero on flat windows
+        result[~np.isfinite(result)] = -1.0
+    min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+    return max_val, max_loc
+
+def top_candidates(result, count, w, h):
+    """Return up to count peak locations of a match map, masking each peak's neighbourhood."""
+    result = result.copy()
+    candidates = []
+    for _ in range(count):
+        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+        if max_val <= -1.0:
+            break
+        candidates.append(max_loc)
+        x, y = max_loc
+        result[max(0, y - h // 2):y + h // 2 + 1, max(0, x - w // 2):x + w // 2 + 1] = -1.0
+    return candidates
+
+def non_max_suppression(points, scores, w, h, overlap=NMS_OVERLAP, max_results=None):
+    """Greedy NMS for equally sized w x h boxes at the given top-left points.
+    
+    Returns the indices of the kept points ordered by descending score.
+    """
+    order = np.argsort(scores, kind='stable')[::-1]
+    xs = points[:, 0]
+    ys = points[:, 1]
+    keep = []
+    while order.size:
+        best = order[0]
+        keep.append(best)
+        if max_results is not None and len(keep) >= max_results:
+            break
+        rest = order[1:]
+        inter = (np.maximum(0, w - np.abs(xs[rest] - xs[best])) *
+                 np.maximum(0, h - np.abs(ys[rest] - ys[best])))
+        iou = inter / (2 * w * h - inter)
+        order = rest[iou <= overlap]
+    return keep
+
+def match_all(screen, template, confidence, max_results=None, overlap=NMS_OVERLAP, mask=None):
+    """Return [(score, top-left)] for every non-overlapping match above confidence."""
+    h, w = template.shape[:2]
+    if screen.shape[0] < h or screen.shape[1] < w:
+        return []
+    result = cv2.matchTemplate(screen, template, cv2.TM_CCOEFF_NORMED, mask=mask)
+    if mask is not None:
+        result[~np.isfinite(result)] = -1.0
+    
+    # Keep only local maxima above the threshold so NMS sees one point per peak
+    peaks = (result >= confidence) & (result == cv2.dilate(result, np.ones((3, 3), np.uint8)))
+    ys, xs = np.nonzero(peaks)
+    if xs.size == 0:
+        return []
+    points = np.stack([xs, ys], axis=1)
+    scores = result[ys, xs]
+    keep = non_max_suppression(points, scores, w, h, overlap, max_results)
+    return [(float(scores[i]), (int(xs[i]), int(ys[i]))) for i in keep]
+
+def match_pyramid(screen, template, levels=PYRAMID_LEVELS, candidates=PYRAMID_CANDIDATES,
+                  mask=None, small_templates=None):
+    """Coarse-to-fine search: match downscaled copies, then refine the best peaks at full size.
+    
+    small_templates may map a pyramid level to a precomputed downscaled template.
+    """
+    levels = usable_pyramid_levels(template, levels)
+    if levels == 0:
+        return match_template(screen, template, mask)
+    
+    scale = 1 << levels
+    small_screen = downscale(screen, scale)
+    small_template = (small_templates or {}).get(levels)
+    if small_template is None:
+        small_template = downscale(template, scale)
+    if small_screen.shape[0] < small_template.shape[0] or small_screen.shape[1] < small_template.shape[1]:
+        return match_template(screen, template, mask)
+    
+    result = cv2.matchTemplate(small_screen, small_template, cv2.TM_CCOEFF_NORMED)
+    th, tw = small_template.shape[:2]
+    h, w = template.shape[:2]
+    screen_h, screen_w = screen.shape[:2]
+    margin = 2 * scale  # Slack for rounding and smoothing at the coarse level
+    
+    best_val, best_loc = -1.0, None
+    for cx, cy in top_candidates(result, candidates, tw, th):
+        x0 = max(0, cx * scale - margin)
+        y0 = max(0, cy * scale - margin)
+        x1 = min(screen_w, cx * scale + w + margin)
+        y1 = min(screen_h, cy * scale + h + margin)
+        val, loc = match_template(screen[y0:y1, x0:x1], template, mask)
+        if loc is not None and val > best_val:
+            best_val, best_loc = val, (x0 + loc[0], y0 + loc[1])
+    return best_val, best_loc
+
+def auto_crop_bounds(template, mask=None, tolerance=AUTO_CROP_TOLERANCE, max_side=AUTO_CROP_MAX_SIDE):
+    """Return the (x0, y0, x1, y1) part of a BGR template worth matching.
+    
+    Margins that stay within tolerance of the border's median color are trimmed.
+    If what remains is still longer than max_side, the max_side window with the
+    highest grayscale variance is kept, since it is the most distinctive part.
+    """
+    h, w = template.shape[:2]
+    border = np.concatenate([template[0], template[-1], template[:, 0], template[:, -1]])
+    background = np.median(border, axis=0)
+    foreground = (np.abs(template.astype(np.int16) - background) > tolerance).any(axis=2)
+    if mask is not None:
+        foreground &= mask > 0
+    rows = np.flatnonzero(foreground.any(axis=1))
+    cols = np.flatnonzero(foreground.any(axis=0))
+    if rows.size == 0:
+        return 0, 0, w, h
+    x0, y0, x1, y1 = int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1
+    
+    crop_h, crop_w = y1 - y0, x1 - x0
+    win_h, win_w = min(crop_h, max_side), min(crop_w, max_side)
+    if (win_h, win_w) != (crop_h, crop_w):
+        gray = cv2.cvtColor(np.ascontiguousarray(template[y0:y1, x0:x1]), cv2.COLOR_BGR2GRAY)
+        sums, square_sums = cv2.integral2(gray, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+        
+        def window_totals(table):
+            return (table[win_h:, win_w:] - table[:-win_h, win_w:]
+                    - table[win_h:, :-win_w] + table[:-win_h, :-win_w])
+        
+        n = win_h * win_w
+        variance = window_totals(square_sums) / n - (window_totals(sums) / n) ** 2
+        vy, vx = np.unravel_index(int(np.argmax(variance)), variance.shape)
+        x0, y0 = x0 + int(vx), y0 + int(vy)
+        x1, y1 = x0 + win_w, y0 + win_h
+    return x0, y0, x1, y1
+
+def template_statistics(template):
+    """Per-channel mean and grayscale standard deviation of a BGR template, for prefilter_bands()."""
+    gray = cv2.cvtColor(np.ascontiguousarray(template), cv2.COLOR_BGR2GRAY)
+    return {'mean': template.reshape(-1, 3).mean(axis=0), 'std': float(gray.std())}
+
+def prefilter_bands(screen, stats, template_shape, mean_tolerance=PREFILTER_MEAN_TOLERANCE,
+                    std_ratio=PREFILTER_STD_RATIO):
+    """Find the parts of screen where a template with the given statistics could still match.
+    
+    An integral image gives every window's per-channel mean in constant time and
+    box filters give its grayscale contrast; windows far from the template's
+    statistics are rejected.
+    Returns a list of (x0, y0, x1, y1) bands, relative to screen, that cover all
+    surviving windows.
+    """
+    h, w = template_shape[:2]
+    if screen.shape[0] < h or screen.shape[1] < w:
+        return []
+    area = h * w
+    screen = np.ascontiguousarray(screen)
+    
+    # Window sums from a 32-bit integral image; wrap-around cancels out in the differences
+    sums = cv2.integral(screen, sdepth=cv2.CV_32S)
+    window_sums = sums[h:, w:] - sums[:-h, w:] - sums[h:, :-w] + sums[:-h, :-w]
+    target = np.round(stats['mean'] * area).astype(np.int32)
+    keep = (np.abs(window_sums - target) <= int(mean_tolerance * area)).all(axis=2)
+    
+    if stats['std'] > 1.0:
+        # Squared sums would need a float64 integral; float32 box filters are much cheaper
+        gray = cv2.cvtColor(screen, cv2.COLOR_BGR2GRAY)
+        valid = (slice(0, keep.shape[0]), slice(0, keep.shape[1]))
+        mean = cv2.boxFilter(gray, cv2.CV_32F, (w, h), anchor=(0, 0), borderType=cv2.BORDER_CONSTANT)[valid]
+        square = cv2.sqrBoxFilter(gray, cv2.CV_32F, (w, h), anchor=(0, 0), borderType=cv2.BORDER_CONSTANT)[valid]
+        std = np.sqrt(np.maximum(square - mean * mean, 0))
+        keep &= (std >= stats['std'] / std_ratio) & (std <= stats['std'] * std_ratio)
+    
+    rows = np.flatnonzero(keep.any(axis=1))
+    if rows.size == 0:
+        return []
+    
+    # Group surviving rows into bands, merging runs closer than a template height
+    bands = []
+    for run in np.split(rows, np.flatnonzero(np.diff(rows) > h) + 1):
+        cols = np.flatnonzero(keep[run[0]:run[-1] + 1].any(axis=0))
+        bands.append((int(cols[0]), int(run[0]), int(cols[-1]) + w, int(run[-1]) + h))
+    return bands
+
+def search_color(screen, template, bounds, pyramid=False, levels=PYRAMID_LEVELS, mask=None,
+                 small_templates=None, stats=None):
+    """Match a color template inside (x0, y0, x1, y1) bounds; returns the score and absolute top-left.
+    
+    With template statistics, non-pyramid searches only correlate the bands
+    that survive prefilter_bands().
+    """
+    x0, y0, x1, y1 = bounds
+    sub = screen[y0:y1, x0:x1]
+    if stats is not None and not pyramid:
+        best_val, best_loc = -1.0, None
+        for bx0, by0, bx1, by1 in prefilter_bands(sub, stats, template.shape):
+            max_val, max_loc = match_template(sub[by0:by1, bx0:bx1], template, mask)
+            if max_loc is not None and max_val > best_val:
+                best_val, best_loc = float(max_val), (x0 + bx0 + max_loc[0], y0 + by0 + max_loc[1])
+        return best_val, best_loc
+    
+    if pyramid:
+        max_val, max_loc = match_pyramid(sub, template, levels, mask=mask, small_templates=small_templates)
+    else:
+        max_val, max_loc = match_template(sub, template, mask)
+    if max_loc is None:
+        return float(max_val), None
+    return float(max_val), (x0 + max_loc[0], y0 + max_loc[1])
+
+def search_shared_frame(frame_spec, template, bounds, pyramid, levels, mask=None, small_templates=None,
+                        stats=None):
+    """Process pool entry point: search_color() on a frame published through SharedFrame."""
+    return search_color(attach_shared_frame(frame_spec), template, bounds, pyramid, levels, mask,
+                        small_templates, stats)
+
+def create_feature_detector(kind=FEATURE_DETECTOR, max_keypoints=FEATURE_MAX_KEYPOINTS,
+                            patch_size=FEATURE_PATCH_SIZE):
+    """Create an ORB or AKAZE detector; both produce binary descriptors compared with Hamming distance.
+    
+    ORB's default 31 px patch and edge threshold leave no keypoints at all on
+    buttons under about 62 px, so a smaller patch_size is used for both.
+    """
+    if kind == 'akaze':
+        return cv2.AKAZE_create()
+    return cv2.ORB_create(nfeatures=max_keypoints, edgeThreshold=patch_size, patchSize=patch_size)
+
+def detect_template_features(detector, gray, border=FEATURE_PATCH_SIZE):
+    """Detect keypoints on a template padded by border, so features near its edges survive.
+    
+    Keypoint positions are shifted back into the template's own coordinates.
+    """
+    padded = cv2.copyMakeBorder(np.ascontiguousarray(gray), border, border, border, border,
+                                cv2.BORDER_REPLICATE)
+    keypoints, descriptors = detector.detectAndCompute(padded, None)
+    for keypoint in keypoints:
+        keypoint.pt = (keypoint.pt[0] - border, keypoint.pt[1] - border)
+    return keypoints, descriptors
+
+def detect_tiled_features(detector, gray, tile_size=FEATURE_TILE_SIZE, overlap=FEATURE_PATCH_SIZE):
+    """Detect keypoints tile by tile so the detector's keypoint cap applies per tile.
+    
+    A single cap over a large, text-heavy screen is spent on the strongest corners
+    anywhere, which can leave none on the target. Tiles overlap by overlap pixels
+    and each keeps only the keypoints inside its own core, so none are duplicated.
+    """
+    h, w = gray.shape[:2]
+    keypoints = []
+    descriptors = []
+    for y0 in range(0, h, tile_size):
+        for x0 in range(0, w, tile_size):
+            x1, y1 = min(w, x0 + tile_size), min(h, y0 + tile_size)
+            tx0, ty0 = max(0, x0 - overlap), max(0, y0 - overlap)
+            tile = np.ascontiguousarray(gray[ty0:min(h, y1 + overlap), tx0:min(w, x1 + overlap)])
+            tile_keypoints, tile_descriptors = detector.detectAndCompute(tile, None)
+            if tile_descriptors is None:
+                continue
+            for keypoint, descriptor in zip(tile_keypoints, tile_descriptors):
+                x, y = keypoint.pt[0] + tx0, keypoint.pt[1] + ty0
+                if x0 <= x < x1 and y0 <= y < y1:
+                    keypoint.pt = (x, y)
+                    keypoints.append(keypoint)
+                    descriptors.append(descriptor)
+    if not descriptors:
+        return keypoints, None
+    return keypoints, np.array(descriptors)
+
+def match_features(template_features, screen_features, template_shape,
+                   ratio=FEATURE_RATIO, min_matches=FEATURE_MIN_MATCHES):
+    """Locate a template through a RANSAC homography between keypoint sets.
+    
+    Returns (inlier fraction, (x, y) center in screen_features coordinates), or (0.0, None).
+    """
+    template_kp, template_des = template_features
+    screen_kp, screen_des = screen_features
+    if template_des is None or screen_des is None or len(template_kp) < min_matches or len(screen_kp) < 2:
+        return 0.0, None
+    
+    pairs = cv2.BFMatcher(cv2.NORM_HAMMING).knnMatch(template_des, screen_des, k=2)
+    good = [pair[0] for pair in pairs if len(pair) == 2 and pair[0].distance < ratio * pair[1].distance]
+    if len(good) < min_matches:
+        return 0.0, None
+    
+    src = np.float32([template_kp[m.queryIdx].pt for m in good]).reshape(-1, 1, 2)
+    dst = np.float32([screen_kp[m.trainIdx].pt for m in good]).reshape(-1, 1, 2)
+    homography, inliers = cv2.findHomography(src, dst, cv2.RANSAC, 5.0)
+    if homography is None or int(inliers.sum()) < min_matches:
+        return 0.0, None
+    
+    # Reject flipped or wildly scaled projections
+    det = np.linalg.det(homography[:2, :2])
+    if det <= 0 or not 0.04 < det < 25:
+        return 0.0, None
+    
+    h, w = template_shape[:2]
+    center = cv2.perspectiveTransform(np.float32([[[w / 2, h / 2]]]), homography)[0, 0]
+    return int(inliers.sum()) / len(good), (float(center[0]), float(center[1]))
+
+# Per-template matching modes: 'color' matches BGR at full size, 'gray' searches the
+# grayscale screen and 'downscaled' searches a shrunken grayscale screen. The gray
+# modes confirm their best candidate with a full-size color match. 'features' matches
+# keypoints through a homography, so one template survives UI scaling; its confidence
+# is the fraction of descriptor matches that agree with the homography.
+MATCH_MODES = ('color', 'gray', 'downscaled', 'features')
 
 class ImageRecognitionTool:
-    def __init__(self):
+    def __init__(self, frame_provider=None, template_store=None):
         self.templates = {}  # Store loaded templates
+        self.template_variants = {}  # Preprocessed copies of each template (gray, mask, pyramid levels)
+        self.template_modes = {}  # Matching mode of each template, one of MATCH_MODES
+        self.template_features = {}  # (keypoints, descriptors) of templates in 'features' mode
+        self.prefilter_stats = {}  # Color statistics of templates loaded with prefilter=True
+        self.template_offsets = {}  # (dx, dy) from a cropped template's center to the original center
+        self.template_stats = {}  # Per-template load details and search counters, see get_template_stats()
+        self.stats_lock = threading.Lock()
+        self.feature_detector = create_feature_detector()
+        self.frame_provider = frame_provider or get_frame_provider()
+        self.template_store = template_store
+        self.pyramid_levels = PYRAMID_LEVELS
+        self.last_locations = {}  # Top-left corner of each template's last match
+        self.location_margin = LOCATION_PRIOR_MARGIN
+        self.change_detector = ChangeDetector()
+        self.reuse_results = True  # Skip matching on screen tiles that have not changed
+        self.result_cache = {}  # (name, confidence, pyramid, region) -> (frame_id, result)
+        self.wait_min_interval = WAIT_MIN_INTERVAL
+        self.wait_max_interval = WAIT_MAX_INTERVAL
+        self.active_waits = set()  # Cancel events of wait_for calls in progress
+        self.wait_lock = threading.Lock()
+        self.gray_source = None  # Frame the cached grayscale copies below were made from
+        self.gray_screen = None
+        self.small_gray_screen = None
+        self.gray_lock = threading.Lock()
+        self.feature_source = None  # Frame the cached screen keypoints below were detected on
+        self.screen_features = {}  # bounds -> (keypoints, descriptors, origin_x, origin_y)
+        self.feature_lock = threading.Lock()
+        self.execution = 'serial'  # How find_many spreads work: 'serial', 'thread' or 'process'
+        self.max_workers = None  # Pool size; None lets concurrent.futures pick one per core
+        self.executor = None
+        self.executor_config = None  # (kind, max_workers) the current executor was created with
+        self.shared_frame = None  # Frame currently published to worker processes
+        self.shared_source = None
+        self.executor_lock = threading.Lock()
     
-    def load_template(self, name, image_path):
+    def load_template(self, name, image_path, mode='color', prefilter=False, auto_crop=False):
+        """Load a template image under name; mode selects how it is matched (see MATCH_MODES).
+        
+        prefilter=True rejects screen windows whose mean color or contrast is far
+        from the template's before running full correlation (color mode only).
+        This is stricter than TM_CCOEFF_NORMED, which ignores uniform brightness
+        and contrast changes: a button drawn 45 levels brighter is found without
+        the prefilter and reported as None with it. It is ignored for templates
+        with transparent pixels, since the screen behind them would skew the
+        window statistics.
+        auto_crop=True matches only the part chosen by auto_crop_bounds(); results
+        are shifted so they still report the center of the full image.
+        """
+        if mode not in MATCH_MODES:
+            raise ValueError(f"Unknown match mode: {mode}")
+        
         try:
-            template = cv2.imread(image_path, cv2.IMREAD_COLOR)
-            if template is None:
-                return False
+            if self.template_store is not None:
+                variants = self.template_store.load(image_path)
+                if variants is None:
+                    return False
+                template = variants['color']
+            else:
+                template = cv2.imread(image_path, cv2.IMREAD_COLOR)
+                if template is None:
+                    return False
+                variants = {'color': template}
+            original_h, original_w = template.shape[:2]
+            offset = (0, 0)
+            if auto_crop:
+                x0, y0, x1, y1 = auto_crop_bounds(template, variants.get('mask'))
+                if (x1 - x0, y1 - y0) != (original_w, original_h):
+                    template = template[y0:y1, x0:x1]
+                    variants = {key: value[y0:y1, x0:x1] for key, value in variants.items()
+                                if key in ('color', 'gray', 'mask')}
+                    for level in range(1, self.pyramid_levels + 1):
+                        variants[f'pyramid_{level}'] = downscale(template, 1 << level)
+                    offset = (original_w // 2 - (x0 + (x1 - x0) // 2), original_h // 2 - (y0 + (y1 - y0) // 2))
+            if mode != 'color':
+                variants = dict(variants)
+                if 'gray' not in variants:
+                    variants['gray'] = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+                if mode == 'downscaled':
+                    variants['gray_small'] = downscale(variants['gray'], DOWNSCALED_MATCH_FACTOR)
+                if mode == 'features':
+                    with self.feature_lock:
+                        features = detect_template_features(self.feature_detector, variants['gray'])
+                    if len(features[0]) < FEATURE_MIN_MATCHES:
+                        print(f"Error loading template: {name} has {len(features[0])} keypoints, "
+                              f"at least {FEATURE_MIN_MATCHES} are needed for feature matching")
+                        return False
+                    self.template_features[name] = features
             self.templates[name] = template
+            self.template_variants[name] = variants
+            self.template_modes[name] = mode
+            mask = variants.get('mask')
+            if prefilter and (mask is None or mask.min() > 0):
+                self.prefilter_stats[name] = template_statistics(template)
+            else:
+                self.prefilter_stats.pop(name, None)
+            self.template_offsets[name] = offset
+            with self.stats_lock:
+                self.template_stats[name] = {
+                    'mode': mode,
+                    'original_size': (original_w, original_h),
+                    'size': (template.shape[1], template.shape[0]),
+                    'center_offset': offset,
+                    'searches': 0,
+                    'search_time': 0.0
+                }
+            self.forget_location(name)
             return True
         except Exception as e:
             print(f"Error loading template: {e}")
             return False
     
-    def find_on_screen(self, template_name, confidence=0.8):
+    def find_on_screen(self, template_name, confidence=0.8, pyramid=False, region=None):
+        """Locate a template and return its center as (x, y, confidence), or None.
+        
+        region limits the search to (left, top, width, height) in screen pixels.
+        """
         if template_name not in self.templates:
             return None
         
+        screenshot, frame_id = self._grab_screen()
+        return self._locate(template_name, screenshot, confidence, pyramid, region, frame_id)
+    
+    def find_in_frame(self, template_name, frame, frame_id=None, confidence=0.8, pyramid=False, region=None):
+        """Like find_on_screen, but against a BGR frame the caller already captured.
+        
+        Pass the frame_id from FrameProvider.get_bgr_snapshot() to enable result reuse.
+        """
+        if template_name not in self.templates:
+            return None
+        return self._locate(template_name, frame, confidence, pyramid, region, frame_id)
+    
+    def find_anchor(self, template_name, confidence=0.8, margin=ANCHOR_VERIFY_MARGIN):
+        """Locate an anchor template, checking a few pixels around its last hit first.
+        
+        Anchors rarely move between clicks, so this usually costs a single
+        template-sized match; the normal search only runs when the check fails.
+        """
+        if template_name not in self.templates:
+            return None
+        
+        screenshot, frame_id = self._grab_screen()
+        last = self.last_locations.get(template_name)
+        if last is not None:
+            h, w = self.templates[template_name].shape[:2]
+            bounds = region_bounds((last[0] - margin, last[1] - margin, w + 2 * margin, h + 2 * margin),
+                                   screenshot.shape)
+            max_val, max_loc = self._search(screenshot, template_name, bounds, False)
+            if max_loc is not None and max_val >= confidence:
+                return self._finish(template_name, confidence, max_val, max_loc, None, frame_id)
+        return self._locate(template_name, screenshot, confidence, False, None, frame_id)
+    
+    def find_many(self, template_names, confidence=0.8, pyramid=False, region=None,
+                  parallel=None, max_workers=None):
+        """Match several templates against one screenshot.
+        
+        Returns a dict mapping each name to its (x, y, confidence) tuple or None,
+        in the order the names were given.
+        
+        parallel selects the execution mode: None uses self.execution, True and
+        False mean 'thread' and 'serial', or pass 'process' explicitly. Threads
+        overlap well because OpenCV releases the GIL inside matchTemplate. The
+        process pool receives the frame through shared memory instead of pickling
+        it; only color-mode full searches are sent there.
+        """
+        if parallel is None:
+            execution = self.execution
+        elif parallel is True:
+            execution = 'thread'
+        elif parallel is False:
+            execution = 'serial'
+        else:
+            execution = parallel
+        
+        results = {name: None for name in template_names}
+        names = [name for name in results if name in self.templates]
+        if not names:
+            return results
+        
+        screenshot, frame_id = self._grab_screen()
+        
+        if execution == 'process':
+            results.update(self._locate_in_processes(names, screenshot, confidence, pyramid, region,
+                                                     frame_id, max_workers))
+        elif execution == 'thread' and len(names) > 1:
+            executor = self._get_executor('thread', max_workers)
+            matches = executor.map(
+                lambda name: self._locate(name, screenshot, confidence, pyramid, region, frame_id), names)
+            results.update(zip(names, matches))
+        else:
+            for name in names:
+                results[name] = self._locate(name, screenshot, confidence, pyramid, region, frame_id)
+        
+        return results
+    
+    def find_all_on_screen(self, template_name, confidence=0.8, max_results=None, region=None):
+        """Locate every instance of a template in a single matching pass.
+        
+        Returns a list of (x, y, confidence) centers sorted by descending confidence.
+        """
+        if template_name not in self.templates:
+            return []
+        
         template = self.templates[template_name]
-        screenshot = pyautogui.screenshot()
-        screenshot = np.array(screenshot)
-        screenshot = cv2.cvtColor(screenshot, cv2.COLOR_RGB2BGR)
+        h, w = template.shape[:2]
+        screenshot, frame_id = self._grab_screen()
+        x0, y0, x1, y1 = region_bounds(region, screenshot.shape)
         
-        result = cv2.matchTemplate(screenshot, template, cv2.TM_CCOEFF_NORMED)
-        min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
+        mask = self.template_variants.get(template_name, {}).get('mask')
+        dx, dy = self.template_offsets.get(template_name, (0, 0))
+        matches = match_all(screenshot[y0:y1, x0:x1], template, confidence, max_results, mask=mask)
+        return [(x0 + loc[0] + w // 2 + dx, y0 + loc[1] + h // 2 + dy, val) for val, loc in matches]
+    
+    def wait_for(self, template_name, timeout=10.0, confidence=0.8, region=None, pyramid=False,
+                 cancel_event=None):
+        """Poll until a template appears and return its (x, y, confidence), or None on timeout.
+        
+        Polling starts fast and backs off while the search region stays static; any
+        change inside the region resets it to the fast rate. Setting cancel_event,
+        or calling cancel_waits() from another thread, ends the wait early with None.
+        A timeout of None waits indefinitely.
+        """
+        if template_name not in self.templates:
+            return None
+        
+        event = cancel_event or threading.Event()
+        with self.wait_lock:
+            self.active_waits.add(event)
+        
+        try:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            interval = self.wait_min_interval
+            last_frame_id = None
+            
+            while not event.is_set():
+                screenshot, frame_id = self.frame_provider.get_bgr_snapshot(max_age=0)
+                result = self._locate(template_name, screenshot, confidence, pyramid, region, frame_id)
+                if result is not None:
+                    return result
+                
+                self.change_detector.update(screenshot, frame_id)
+                bounds = region_bounds(region, screenshot.shape)
+                if last_frame_id is not None and self.change_detector.changed_since(last_frame_id, bounds):
+                    interval = self.wait_min_interval
+                else:
+                    interval = min(self.wait_max_interval, interval * WAIT_BACKOFF)
+                last_frame_id = frame_id
+                
+                delay = interval
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return None
+                    delay = min(delay, remaining)
+                event.wait(delay)
+            
+            return None
+        finally:
+            with self.wait_lock:
+                self.active_waits.discard(event)
+    
+    def cancel_waits(self):
+        """Wake every wait_for call in progress and make it return None."""
+        with self.wait_lock:
+            for event in self.active_waits:
+                event.set()
+    
+    def get_template_stats(self, template_name=None):
+        """Return load details and search cost for one template, or a dict for all of them.
+        
+        'pixels' is the matched template area, which matchTemplate time scales with;
+        'area_ratio' compares it with the image as loaded. 'searches' and
+        'search_time' cover searches run in this process, excluding cache hits.
+        """
+        with self.stats_lock:
+            names = list(self.template_stats) if template_name is None else [template_name]
+            stats = {}
+            for name in names:
+                if name not in self.template_stats:
+                    continue
+                entry = dict(self.template_stats[name])
+                (w, h), (original_w, original_h) = entry['size'], entry['original_size']
+                entry['pixels'] = w * h
+                entry['area_ratio'] = w * h / max(1, original_w * original_h)
+                entry['avg_search_ms'] = entry['search_time'] * 1000.0 / max(1, entry['searches'])
+                stats[name] = entry
+        if template_name is not None:
+            return stats.get(template_name)
+        return stats
+    
+    def forget_location(self, template_name=None):
+        """Drop the remembered last hit and cached results for one template, or for all of them."""
+        if template_name is None:
+            self.last_locations.clear()
+            self.result_cache.clear()
+        else:
+            self.last_locations.pop(template_name, None)
+            for key in [key for key in self.result_cache if key[0] == template_name]:
+                self.result_cache.pop(key, None)
+    
+    def shutdown(self):
+        """Stop worker pools and release the shared-memory frame."""
+        with self.executor_lock:
+            if self.executor is not None:
+                self.executor.shutdown(wait=True)
+                self.executor = None
+                self.executor_config = None
+            if self.shared_frame is not None:
+                self.shared_frame.close()
+                self.shared_frame = None
+                self.shared_source = None
+    
+    def _get_executor(self, kind, max_workers=None):
+        config = (kind, max_workers or self.max_workers)
+        with self.executor_lock:
+            if self.executor is None or self.executor_config != config:
+                if self.executor is not None:
+                    self.executor.shutdown(wait=True)
+                if kind == 'process':
+                    # spawn avoids forking a process that runs Qt and listener threads
+                    self.executor = ProcessPoolExecutor(max_workers=config[1],
+                                                        mp_context=multiprocessing.get_context('spawn'))
+                else:
+                    self.executor = ThreadPoolExecutor(max_workers=config[1])
+                self.executor_config = config
+            return self.executor
+    
+    def _share_frame(self, screen):
+        """Publish screen to worker processes, reusing the block while the frame is unchanged."""
+        with self.executor_lock:
+            if self.shared_source is not screen:
+                if self.shared_frame is not None:
+                    self.shared_frame.close()
+                self.shared_frame = SharedFrame(screen)
+                self.shared_source = screen
+            return self.shared_frame.spec
+    
+    def _locate_in_processes(self, names, screen, confidence, pyramid, region, frame_id, max_workers):
+        executor = self._get_executor('process', max_workers)
+        results = {}
+        pending = []
+        frame_spec = None
+        
+        for name in names:
+            result, search_bounds, cache_key = self._plan(name, screen, confidence, pyramid, region, frame_id)
+            if search_bounds is None:
+                results[name] = result
+                continue
+            
+            if self.template_modes.get(name, 'color') != 'color':
+                # Gray and feature modes keep per-frame caches in this process
+                max_val, max_loc = self._search(screen, name, search_bounds, pyramid)
+                results[name] = self._finish(name, confidence, max_val, max_loc, cache_key, frame_id)
+                continue
+            
+            if frame_spec is None:
+                frame_spec = self._share_frame(screen)
+            variants = self.template_variants.get(name, {})
+            mask = variants.get('mask')
+            small_templates = {level: np.asarray(variants[f'pyramid_{level}'])
+                               for level in range(1, self.pyramid_levels + 1) if f'pyramid_{level}' in variants}
+            future = executor.submit(search_shared_frame, frame_spec, np.asarray(self.templates[name]),
+                                     search_bounds, pyramid, self.pyramid_levels,
+                                     None if mask is None else np.asarray(mask), small_templates,
+                                     self.prefilter_stats.get(name))
+            pending.append((name, future, cache_key))
+        
+        # Merge worker results back in request order
+        for name, future, cache_key in pending:
+            max_val, max_loc = future.result()
+            results[name] = self._finish(name, confidence, max_val, max_loc, cache_key, frame_id)
+        return results
+    
+    def _grab_screen(self):
+        return self.frame_provider.get_bgr_snapshot()
+    
+    def _locate(self, template_name, screen, confidence, pyramid, region, frame_id=None):
+        result, search_bounds, cache_key = self._plan(template_name, screen, confidence, pyramid, region, frame_id)
+        if search_bounds is None:
+            return result
+        max_val, max_loc = self._search(screen, template_name, search_bounds, pyramid)
+        return self._finish(template_name, confidence, max_val, max_loc, cache_key, frame_id)
+    
+    def _plan(self, template_name, screen, confidence, pyramid, region, frame_id):
+        """Try to answer a lookup from cached results or the window around the last hit.
+        
+        Returns (result, search_bounds, cache_key). search_bounds is None when result
+        is final; otherwise it is the area that still needs a full search.
+        """
+        template = self.templates[template_name]
+        h, w = template.shape[:2]
+        bounds = region_bounds(region, screen.shape)
+        x0, y0, x1, y1 = bounds
+        
+        cache_key = None
+        search_bounds = bounds
+        if self.reuse_results and frame_id is not None:
+            self.change_detector.update(screen, frame_id)
+            cache_key = (template_name, confidence, pyramid, tuple(region) if region is not None else None)
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                cached_id, result = cached
+                if result is not None:
+                    # A hit stays valid while the tiles under it are unchanged
+                    dx, dy = self.template_offsets.get(template_name, (0, 0))
+                    left, top = result[0] - dx - w // 2, result[1] - dy - h // 2
+                    match_box = (left, top, left + w, top + h)
+                    if cached_id == frame_id or not self.change_detector.changed_since(cached_id, match_box):
+                        self.result_cache[cache_key] = (frame_id, result)
+                        return result, None, cache_key
+                else:
+                    # A miss only needs re-checking where the screen changed
+                    changed = self.change_detector.changed_bounds(cached_id, bounds)
+                    if cached_id == frame_id or changed is None:
+                        self.result_cache[cache_key] = (frame_id, None)
+                        return None, None, cache_key
+                    search_bounds = (max(x0, changed[0] - w), max(y0, changed[1] - h),
+                                     min(x1, changed[2] + w), min(y1, changed[3] + h))
+        
+        # Search a small window around the last hit before scanning the whole region.
+        # Tiles under whatever gets searched are hashed now so the cached result can
+        # be checked against this frame later
+        last = self.last_locations.get(template_name)
+        if last is not None:
+            margin = self.location_margin
+            window = (max(x0, last[0] - margin), max(y0, last[1] - margin),
+                      min(x1, last[0] + w + margin), min(y1, last[1] + h + margin))
+            if cache_key is not None:
+                self.change_detector.track(frame_id, window)
+            max_val, max_loc = self._search(screen, template_name, window, False)
+            if max_loc is not None and max_val >= confidence:
+                return self._finish(template_name, confidence, max_val, max_loc, cache_key, frame_id), None, cache_key
+        
+        if cache_key is not None:
+            self.change_detector.track(frame_id, bounds)
+        return None, search_bounds, cache_key
+    
+    def _finish(self, template_name, confidence, max_val, max_loc, cache_key, frame_id):
+        """Turn a search score into a result and record it as the last hit and cached result."""
+        result = None
+        if max_loc is not None and max_val >= confidence:
+            h, w = self.templates[template_name].shape[:2]
+            self.last_locations[template_name] = max_loc
+            # Calculate the center point of the match, shifted back to the uncropped image's center
+            dx, dy = self.template_offsets.get(template_name, (0, 0))
+            center_x = max_loc[0] + w // 2 + dx
+            center_y = max_loc[1] + h // 2 + dy
+            result = (center_x, center_y, max_val)
+        
+        if cache_key is not None:
+            self.result_cache[cache_key] = (frame_id, result)
+        return result
+    
+    def _search(self, screen, template_name, bounds, pyramid):
+        """Match inside (x0, y0, x1, y1) bounds and return the score and absolute top-left."""
+        start = time.perf_counter()
+        try:
+            return self._search_mode(screen, template_name, bounds, pyramid)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.stats_lock:
+                stats = self.template_stats.get(template_name)
+                if stats is not None:
+                    stats['searches'] += 1
+                    stats['search_time'] += elapsed
+    
+    def _search_mode(self, screen, template_name, bounds, pyramid):
+        template = self.templates[template_name]
+        variants = self.template_variants.get(template_name, {})
+        mask = variants.get('mask')
+        mode = self.template_modes.get(template_name, 'color')
+        if mode == 'features':
+            return self._search_features(screen, template_name, bounds)
+        if mode != 'color':
+            return self._search_gray(screen, template_name, bounds, pyramid, mode == 'downscaled')
+        
+        small_templates = {level: variants[f'pyramid_{level}']
+                           for level in range(1, self.pyramid_levels + 1) if f'pyramid_{level}' in variants}
+        return search_color(screen, template, bounds, pyramid, self.pyramid_levels, mask, small_templates,
+                            self.prefilter_stats.get(template_name))
+    
+    def _search_gray(self, screen, template_name, bounds, pyramid, downscaled):
+        """Search on grayscale (optionally shrunken) pixels, then confirm the best hit in color."""
+        template = self.templates[template_name]
+        variants = self.template_variants[template_name]
+        h, w = template.shape[:2]
+        x0, y0, x1, y1 = bounds
+        
+        if downscaled:
+            scale = DOWNSCALED_MATCH_FACTOR
+            small, ox, oy = self._gray_variant(screen, bounds, True)
+            max_val, max_loc = match_template(small, variants['gray_small'])
+        else:
+            scale = 1
+            gray, ox, oy = self._gray_variant(screen, bounds, False)
+            if pyramid:
+                max_val, max_loc = match_pyramid(gray, variants['gray'], self.pyramid_levels)
+            else:
+                max_val, max_loc = match_template(gray, variants['gray'], variants.get('mask'))
+        if max_loc is None:
+            return max_val, None
+        
+        # Verify in color at full size in a small window around the candidate
+        margin = scale + 1
+        cx, cy = ox + max_loc[0] * scale, oy + max_loc[1] * scale
+        window = (max(x0, cx - margin), max(y0, cy - margin),
+                  min(x1, cx + w + margin), min(y1, cy + h + margin))
+        max_val, max_loc = match_template(screen[window[1]:window[3], window[0]:window[2]],
+                                          template, variants.get('mask'))
+        if max_loc is None:
+            return max_val, None
+        return max_val, (window[0] + max_loc[0], window[1] + max_loc[1])
+    
+    def _search_features(self, screen, template_name, bounds):
+        """Feature-based search; returns the score and the top-left of a template-sized box at the hit."""
+        h, w = self.templates[template_name].shape[:2]
+        keypoints, descriptors, ox, oy = self._detect_screen_features(screen, bounds)
+        score, center = match_features(self.template_features[template_name], (keypoints, descriptors),
+                                       (h, w))
+        if center is None:
+            return score, None
+        return score, (int(round(ox + center[0])) - w // 2, int(round(oy + center[1])) - h // 2)
+    
+    def _detect_screen_features(self, screen, bounds):
+        """Detect keypoints inside bounds once per frame and reuse them for every template."""
+        with self.feature_lock:
+            if self.feature_source is not screen:
+                self.feature_source = screen
+                self.screen_features = {}
+            cached = self.screen_features.get(bounds)
+            if cached is None:
+                gray, ox, oy = self._gray_variant(screen, bounds, False)
+                keypoints, descriptors = detect_tiled_features(self.feature_detector, gray)
+                cached = self.screen_features[bounds] = (keypoints, descriptors, ox, oy)
+            return cached
+    
+    def _gray_variant(self, screen, bounds, downscaled):
+        """Return grayscale (or shrunken grayscale) pixels covering bounds and their screen origin.
         
-        if max_val >= confidence:
-            # Get the dimensions of the template
-            h, w = template.shape[:2]
-            # Calculate the center point of the match
-            center_x = max_loc[0] + w // 2
-            center_y = max_loc[1] + h // 2
-            return (center_x, center_y, max_val)
+        Small windows are converted directly; larger searches share one
+        conversion of the whole frame.
+        """
+        x0, y0, x1, y1 = bounds
+        scale = DOWNSCALED_MATCH_FACTOR
+        if (x1 - x0) * (y1 - y0) * 4 < screen.shape[0] * screen.shape[1]:
+            gray = cv2.cvtColor(screen[y0:y1, x0:x1], cv2.COLOR_BGR2GRAY)
+            return (downscale(gray, scale) if downscaled else gray), x0, y0
         
-        return None
\ No newline at end of file
+        with self.gray_lock:
+            if self.gray_source is not screen:
+                self.gray_source = screen
+                self.gray_screen = cv2.cvtColor(screen, cv2.COLOR_BGR2GRAY)
+                self.small_gray_screen = None
+            if not downscaled:
+                return self.gray_screen[y0:y1, x0:x1], x0, y0
+            if self.small_gray_screen is None:
+                self.small_gray_screen = downscale(self.gray_screen, scale)
+            sx, sy = x0 // scale, y0 // scale
+            return self.small_gray_screen[sy:y1 // scale, sx:x1 // scale], sx * scale, sy * scale
\ No newline at end of file
@@ -0,0 +1,347 @@
+"""
+Input injection backends for the Auto Click application.
+"""
+import threading
+import time
+
+import pyautogui
+
+try:
+    from pynput import mouse as pynput_mouse, keyboard as pynput_keyboard
+except ImportError:
+    pynput_mouse = pynput_keyboard = None
+
+try:
+    from Xlib import X, XK, display as xdisplay
+    from Xlib.ext import xtest
+except ImportError:
+    xdisplay = None
+
+from autoclick.config import INPUT_BACKEND
+
+# Scripts store keys under pynput's names (as recorded) or pyautogui's (as typed in
+# the editor); these aliases fold both onto pynput's names.
+KEY_ALIASES = {
+    'escape': 'esc',
+    'return': 'enter',
+    'pageup': 'page_up',
+    'pagedown': 'page_down',
+    'pgup': 'page_up',
+    'pgdn': 'page_down',
+    'del': 'delete',
+    'win': 'cmd',
+    'winleft': 'cmd_l',
+    'winright': 'cmd_r',
+    'command': 'cmd',
+    'control': 'ctrl',
+    'ctrlleft': 'ctrl_l',
+    'ctrlright': 'ctrl_r',
+    'shiftleft': 'shift_l',
+    'shiftright': 'shift_r',
+    'altleft': 'alt_l',
+    'altright': 'alt_r',
+    'option': 'alt',
+    'capslock': 'caps_lock',
+    'numlock': 'num_lock',
+    'scrolllock': 'scroll_lock',
+    'printscreen': 'print_screen',
+    'prtsc': 'print_screen'
+}
+
+def normalize_key(key):
+    """Return the pynput-style name of a key; single characters are returned unchanged."""
+    if len(key) == 1:
+        return key
+    key = key.lower()
+    return KEY_ALIASES.get(key, key)
+
+class InputBackend:
+    """Base class for input backends.
+    
+    Coordinates are screen pixels, buttons are 'left', 'right' or 'middle',
+    and keys are single characters or names such as 'enter', 'shift_r' or 'f5'.
+    """
+    name = None
+    
+    def click(self, x, y, button='left'):
+        raise NotImplementedError
+    
+    def move(self, x, y):
+        raise NotImplementedError
+    
+    def press(self, key):
+        self.key_down(key)
+        self.key_up(key)
+    
+    def key_down(self, key):
+        raise NotImplementedError
+    
+    def key_up(self, key):
+        raise NotImplementedError
+    
+    def scroll(self, amount):
+        raise NotImplementedError
+    
+    def close(self):
+        pass
+
+class PyAutoGUIInput(InputBackend):
+    """Goes through pyautogui, including its PAUSE delay and fail-safe corner check."""
+    name = 'pyautogui'
+    
+    # pyautogui's names for keys that pynput names differently
+    KEY_NAMES = {
+        'page_up': 'pageup',
+        'page_down': 'pagedown',
+        'caps_lock': 'capslock',
+        'num_lock': 'numlock',
+        'scroll_lock': 'scrolllock',
+        'print_screen': 'printscreen',
+        'cmd': 'win',
+        'cmd_l': 'winleft',
+        'cmd_r': 'winright',
+        'ctrl_l': 'ctrlleft',
+        'ctrl_r': 'ctrlright',
+        'shift_l': 'shiftleft',
+        'shift_r': 'shiftright',
+        'alt_l': 'altleft',
+        'alt_r': 'altright',
+        'alt_gr': 'altright'
+    }
+    
+    def _key(self, key):
+        key = normalize_key(key)
+        return self.KEY_NAMES.get(key, key)
+    
+    def click(self, x, y, button='left'):
+        pyautogui.click(x, y, button=button)
+    
+    def move(self, x, y):
+        pyautogui.moveTo(x, y)
+    
+    def press(self, key):
+        pyautogui.press(self._key(key))
+    
+    def key_down(self, key):
+        pyautogui.keyDown(self._key(key))
+    
+    def key_up(self, key):
+        pyautogui.keyUp(self._key(key))
+    
+    def scroll(self, amount):
+        pyautogui.scroll(amount)
+
+class PynputInput(InputBackend):
+    """Sends events straight through pynput's controllers, with no implicit pauses."""
+    name = 'pynput'
+    
+    def __init__(self):
+        if pynput_mouse is None:
+            raise RuntimeError("The pynput package is required for the pynput input backend")
+        self.mouse = pynput_mouse.Controller()
+        self.keyboard = pynput_keyboard.Controller()
+    
+    def _key(self, key):
+        key = normalize_key(key)
+        if len(key) == 1:
+            return key
+        special = getattr(pynput_keyboard.Key, key, None)
+        if special is None:
+            raise ValueError(f"Unknown key: {key}")
+        return special
+    
+    def click(self, x, y, button='left'):
+        self.mouse.position = (x, y)
+        self.mouse.click(getattr(pynput_mouse.Button, button))
+    
+    def move(self, x, y):
+        self.mouse.position = (x, y)
+    
+    def key_down(self, key):
+        self.keyboard.press(self._key(key))
+    
+    def key_up(self, key):
+        self.keyboard.release(self._key(key))
+    
+    def scroll(self, amount):
+        self.mouse.scroll(0, amount)
+
+class XTestInput(InputBackend):
+    """Injects events with the X11 XTest extension through python-xlib (Linux only).
+    
+    Each event is a single request on an already open display connection, which
+    makes this the cheapest backend on X11.
+    """
+    name = 'xtest'
+    
+    BUTTONS = {'left': 1, 'middle': 2, 'right': 3}
+    KEYSYM_NAMES = {
+        'enter': 'Return',
+        'esc': 'Escape',
+        'backspace': 'BackSpace',
+        'tab': 'Tab',
+        'space': 'space',
+        'delete': 'Delete',
+        'insert': 'Insert',
+        'home': 'Home',
+        'end': 'End',
+        'page_up': 'Prior',
+        'page_down': 'Next',
+        'up': 'Up',
+        'down': 'Down',
+        'left': 'Left',
+        'right': 'Right',
+        'shift': 'Shift_L',
+        'shift_l': 'Shift_L',
+        'shift_r': 'Shift_R',
+        'ctrl': 'Control_L',
+        'ctrl_l': 'Control_L',
+        'ctrl_r': 'Control_R',
+        'alt': 'Alt_L',
+        'alt_l': 'Alt_L',
+        'alt_r': 'Alt_R',
+        'alt_gr': 'ISO_Level3_Shift',
+        'cmd': 'Super_L',
+        'cmd_l': 'Super_L',
+        'cmd_r': 'Super_R',
+        'caps_lock': 'Caps_Lock',
+        'num_lock': 'Num_Lock',
+        'scroll_lock': 'Scroll_Lock',
+        'print_screen': 'Print',
+        'menu': 'Menu',
+        'pause': 'Pause'
+    }
+    
+    def __init__(self):
+        if xdisplay is None:
+            raise RuntimeError("The python-xlib package is required for the xtest input backend")
+        self.local = threading.local()  # Xlib connections must not be shared between threads
+        self._display()
+    
+    def _display(self):
+        display = getattr(self.local, 'display', None)
+        if display is None:
+            display = self.local.display = xdisplay.Display()
+        return display
+    
+    def _keycode(self, key):
+        """Return (keycode, needs_shift) for a key name or character."""
+        display = self._display()
+        key = normalize_key(key)
+        if len(key) == 1:
+            keysym = XK.string_to_keysym(key) or ord(key)
+        elif key.startswith('f') and key[1:].isdigit():
+            keysym = XK.string_to_keysym(key.upper())
+        else:
+            keysym = XK.string_to_keysym(self.KEYSYM_NAMES.get(key, key))
+        keycode = display.keysym_to_keycode(keysym)
+        if not keycode:
+            raise ValueError(f"Unknown key: {key}")
+        # Characters such as 'A' or '!' sit on the shifted level of their key
+        needs_shift = len(key) == 1 and display.keycode_to_keysym(keycode, 0) != keysym
+        return keycode, needs_shift
+    
+    def _send(self, event_type, detail=0, x=None, y=None):
+        display = self._display()
+        if x is None:
+            xtest.fake_input(display, event_type, detail)
+        else:
+            xtest.fake_input(display, event_type, detail, x=int(x), y=int(y))
+    
+    def click(self, x, y, button='left'):
+        self._send(X.MotionNotify, x=x, y=y)
+        self._send(X.ButtonPress, self.BUTTONS[button])
+        self._send(X.ButtonRelease, self.BUTTONS[button])
+        self._display().sync()
+    
+    def move(self, x, y):
+        self._send(X.MotionNotify, x=x, y=y)
+        self._display().sync()
+    
+    def key_down(self, key):
+        keycode, needs_shift = self._keycode(key)
+        if needs_shift:
+            self._send(X.KeyPress, self._display().keysym_to_keycode(XK.XK_Shift_L))
+        self._send(X.KeyPress, keycode)
+        self._display().sync()
+    
+    def key_up(self, key):
+        keycode, needs_shift = self._keycode(key)
+        self._send(X.KeyRelease, keycode)
+        if needs_shift:
+            self._send(X.KeyRelease, self._display().keysym_to_keycode(XK.XK_Shift_L))
+        self._display().sync()
+    
+    def scroll(self, amount):
+        # Wheel clicks are buttons 4 (up) and 5 (down)
+        button = 4 if amount > 0 else 5
+        for _ in range(abs(int(amount))):
+            self._send(X.ButtonPress, button)
+            self._send(X.ButtonRelease, button)
+        self._display().sync()
+    
+    def close(self):
+        display = getattr(self.local, 'display', None)
+        if display is not None:
+            display.close()
+            self.local.display = None
+
+class NullInput(InputBackend):
+    """Sends nothing to the OS and records every call, for headless tests and dry runs.
+    
+    events holds (perf_counter_ns, method, args) tuples in call order.
+    """
+    name = 'null'
+    
+    def __init__(self):
+        self.events = []
+        self.lock = threading.Lock()
+    
+    def _record(self, method, *args):
+        with self.lock:
+            self.events.append((time.perf_counter_ns(), method, args))
+    
+    def click(self, x, y, button='left'):
+        self._record('click', x, y, button)
+    
+    def move(self, x, y):
+        self._record('move', x, y)
+    
+    def press(self, key):
+        self._record('press', key)
+    
+    def key_down(self, key):
+        self._record('key_down', key)
+    
+    def key_up(self, key):
+        self._record('key_up', key)
+    
+    def scroll(self, amount):
+        self._record('scroll', amount)
+
+INPUT_BACKENDS = {
+    'pyautogui': PyAutoGUIInput,
+    'pynput': PynputInput,
+    'xtest': XTestInput,
+    'null': NullInput
+}
+
+def available_input_backends():
+    """Names of the backends whose dependencies are installed."""
+    names = ['pyautogui']
+    if pynput_mouse is not None:
+        names.append('pynput')
+    if xdisplay is not None:
+        names.append('xtest')
+    names.append('null')
+    return names
+
+def get_input_backend(name=INPUT_BACKEND):
+    """Create an input backend by name, falling back to pyautogui if it cannot start."""
+    if name not in INPUT_BACKENDS:
+        raise ValueError(f"Unknown input backend: {name}")
+    try:
+        return INPUT_BACKENDS[name]()
+    except Exception as e:
+        print(f"Error starting {name} input backend: {e}")
+        return PyAutoGUIInput()
\ No newline at end of file
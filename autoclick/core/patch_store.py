@@ -0,0 +1,98 @@
+"""
+Deduplicated storage of recorded anchor patches for the Auto Click application.
+"""
+import os
+import threading
+
+import cv2
+import numpy as np
+
+from autoclick.config import PATCH_HASH_DISTANCE, PATCH_MATCH_MSE
+from autoclick.utils.system_utils import get_app_data_path
+
+def dhash(image, hash_size=8):
+    """Return a hash_size * hash_size bit difference hash of an image as an int.
+    
+    Each bit records whether a pixel of the shrunk grayscale image is brighter
+    than its right-hand neighbour, so small color or compression noise rarely
+    flips a bit while a different image flips many.
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(np.ascontiguousarray(image[:, :, :3]), cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(image, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = np.packbits(small[:, 1:] > small[:, :-1])
+    return int.from_bytes(bits.tobytes(), 'big')
+
+class PatchStore:
+    """Stores image patches as PNG files named by their perceptual hash.
+    
+    The hash only narrows down the candidates: a stored file is reused only when
+    it is within max_distance bits of the new patch and also has the same size
+    and a mean squared pixel error of at most max_mse. Repeated clicks on the same
+    button then share a single anchor image, while small but real differences
+    such as a changed label or color get their own file.
+    """
+    
+    def __init__(self, root=None, max_distance=PATCH_HASH_DISTANCE, max_mse=PATCH_MATCH_MSE):
+        self.root = root or os.path.join(get_app_data_path(), 'anchors')
+        self.max_distance = max_distance
+        self.max_mse = max_mse
+        self.lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+        
+        self.hashes = np.zeros(0, np.uint64)
+        self.paths = []
+        for filename in sorted(os.listdir(self.root)):
+            name, ext = os.path.splitext(filename)
+            name = name.split('_')[0]
+            if ext == '.png' and len(name) == 16:
+                try:
+                    self._index(int(name, 16), os.path.join(self.root, filename))
+                except ValueError:
+                    continue
+    
+    def add(self, patch):
+        """Store a BGR patch (unless a near-duplicate exists) and return its file path."""
+        patch = np.ascontiguousarray(patch)
+        patch_hash = dhash(patch)
+        with self.lock:
+            for path in self.candidates(patch_hash):
+                if self._same_pixels(patch, path):
+                    return path
+            
+            # Patches with an identical hash but different pixels get a numbered suffix
+            path = os.path.join(self.root, f'{patch_hash:016x}.png')
+            suffix = 1
+            while os.path.exists(path):
+                path = os.path.join(self.root, f'{patch_hash:016x}_{suffix}.png')
+                suffix += 1
+            tmp_path = path + '.tmp.png'
+            if not cv2.imwrite(tmp_path, patch):
+                return None
+            os.replace(tmp_path, path)
+            self._index(patch_hash, path)
+            return path
+    
+    def candidates(self, patch_hash):
+        """Return the paths of stored patches within max_distance bits, closest first."""
+        if not self.paths:
+            return []
+        # Popcount of the XOR against every stored hash at once
+        diff = np.bitwise_xor(self.hashes, np.uint64(patch_hash))
+        distances = np.unpackbits(diff.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+        order = np.argsort(distances, kind='stable')
+        return [self.paths[i] for i in order if distances[i] <= self.max_distance]
+    
+    def __len__(self):
+        return len(self.paths)
+    
+    def _same_pixels(self, patch, path):
+        stored = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+        if stored is None or stored.shape != patch.shape:
+            return False
+        error = np.mean((stored.astype(np.float32) - patch.astype(np.float32)) ** 2)
+        return error <= self.max_mse
+    
+    def _index(self, patch_hash, path):
+        self.hashes = np.append(self.hashes, np.uint64(patch_hash))
+        self.paths.append(path)
\ No newline at end of file
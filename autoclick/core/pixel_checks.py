@@ -0,0 +1,72 @@
+"""
+Pixel color checks for the Auto Click application.
+"""
+import time
+import threading
+
+import numpy as np
+
+from autoclick.config import PIXEL_TOLERANCE, PIXEL_POLL_INTERVAL
+from autoclick.core.frame_cache import get_frame_provider
+
+class PixelChecker:
+    """Evaluates a batch of "pixel (x, y) is within tolerance of color C" predicates on one frame.
+    
+    Each condition is a dict with 'x', 'y', 'color' as (r, g, b) and an optional
+    per-channel 'tolerance'. The conditions are packed into arrays once so every
+    evaluation is a single fancy-indexing gather and compare.
+    """
+    
+    def __init__(self, conditions, frame_provider=None):
+        self.conditions = list(conditions)
+        self.frame_provider = frame_provider or get_frame_provider()
+        self.xs = np.array([c['x'] for c in self.conditions], dtype=np.intp)
+        self.ys = np.array([c['y'] for c in self.conditions], dtype=np.intp)
+        # Stored in BGR order to match captured frames
+        self.colors = np.array([tuple(c['color'])[2::-1] for c in self.conditions], dtype=np.int16).reshape(-1, 3)
+        self.tolerances = np.array([c.get('tolerance', PIXEL_TOLERANCE) for c in self.conditions], dtype=np.int16)
+    
+    def evaluate(self, frame=None):
+        """Return a bool array with one entry per condition; pixels off screen never match."""
+        if frame is None:
+            frame = self.frame_provider.get_frame()
+        h, w = frame.shape[:2]
+        inside = (self.xs >= 0) & (self.xs < w) & (self.ys >= 0) & (self.ys < h)
+        pixels = frame[np.clip(self.ys, 0, h - 1), np.clip(self.xs, 0, w - 1), :3].astype(np.int16)
+        distance = np.abs(pixels - self.colors).max(axis=1)
+        return inside & (distance <= self.tolerances)
+    
+    def all_match(self, frame=None):
+        return bool(self.evaluate(frame).all())
+    
+    def any_match(self, frame=None):
+        return bool(self.evaluate(frame).any())
+
+def check_pixels(conditions, frame=None, frame_provider=None):
+    """Evaluate pixel conditions once and return a bool array of results."""
+    return PixelChecker(conditions, frame_provider).evaluate(frame)
+
+def wait_until_pixels(conditions, timeout=10.0, require='all', interval=PIXEL_POLL_INTERVAL,
+                      cancel_event=None, frame_provider=None):
+    """Block until all (or any, with require='any') conditions hold.
+    
+    Returns True once satisfied, False on timeout or when cancel_event is set.
+    A timeout of None waits indefinitely.
+    """
+    checker = PixelChecker(conditions, frame_provider)
+    satisfied = checker.all_match if require == 'all' else checker.any_match
+    event = cancel_event or threading.Event()
+    deadline = None if timeout is None else time.monotonic() + timeout
+    
+    while not event.is_set():
+        if satisfied(checker.frame_provider.get_frame(max_age=interval)):
+            return True
+        delay = interval
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            delay = min(delay, remaining)
+        event.wait(delay)
+    
+    return False
\ No newline at end of file
@@ -1,87 +1,298 @@
 """
 Playback functionality for the Auto Click application.
 """
+import threading
 import time
-import pyautogui
 import numpy as np
 from PyQt5.QtCore import QThread, pyqtSignal
 
+from autoclick.config import STABLE_REGION_MS, INPUT_BACKEND
+from autoclick.core.frame_cache import get_frame_provider
+from autoclick.core.image_recognition import ImageRecognitionTool
+from autoclick.core.stability import wait_until_stable
+from autoclick.core.checkpoints import check_checkpoint
+from autoclick.core.scheduler import DeadlineScheduler
+from autoclick.core.input_backends import InputBackend, get_input_backend
+from autoclick.core.compiler import compile_script, OP_WAIT_STABLE
+
+ABORT = -1  # Handler result that ends playback
+
 class PlaybackThread(QThread):
     playback_finished = pyqtSignal()
     action_played = pyqtSignal(int)
+    checkpoint_failed = pyqtSignal(int, int)  # Action index, hash distance
+    paused_changed = pyqtSignal(bool)
     
-    def __init__(self, actions, speed_factor=1.0, repeat_count=1, randomize=False, randomize_factor=0.1):
+    def __init__(self, actions, speed_factor=1.0, repeat_count=1, randomize=False, randomize_factor=0.1,
+                 image_recognition=None, input_backend=None):
         super().__init__()
-        self.actions = actions
+        # Only the compiled form is kept; the caller owns the action dicts
+        self.program = compile_script(actions)
         self.speed_factor = speed_factor
         self.repeat_count = repeat_count
         self.running = False
+        self.paused = False
+        self.pending_speed = None  # Speed requested by set_speed(), applied by the playback thread
         self.randomize = randomize
         self.randomize_factor = randomize_factor
+        self.image_recognition = image_recognition  # Created on first use by anchor clicks
+        self.stop_event = threading.Event()  # Interrupts waits inside actions
+        self.wake_event = threading.Event()  # Set by stop(), pause(), resume() and set_speed()
+        self.stop_requested_ns = None
+        self.stop_latency = None  # Seconds from the last stop() call until run() returned
+        if not isinstance(input_backend, InputBackend):
+            # A backend name (or None for the default) from the profile settings
+            input_backend = get_input_backend(input_backend or INPUT_BACKEND)
+        self.input = input_backend
+        self.scheduler = DeadlineScheduler(speed_factor)
+        self.timing_report = None  # Lateness summary of the last run, see DeadlineScheduler.report()
+        
+        # Dispatch table indexed by opcode, see autoclick.core.compiler.OPCODES
+        self.handlers = (self._click, self._move, self._keypress, self._keydown, self._keyup, self._scroll,
+                         self._anchor_click, self._wait_stable, self._checkpoint, self._other)
     
     def run(self):
         self.running = True
+        self.paused = False
+        self.pending_speed = None
+        self.stop_event.clear()
+        self.wake_event.clear()
+        self.stop_requested_ns = None
+        self.stop_latency = None
+        self.scheduler.speed_factor = self.speed_factor
+        self.scheduler.start()
+        
+        # Plain lists index faster than NumPy scalars in the loop below
+        opcodes = self.program.opcodes.tolist()
+        times = self.program.times.tolist()
+        self.x = self.program.x.tolist()
+        self.y = self.program.y.tolist()
+        self.arg = self.program.arg.tolist()
+        self.button = self.program.button.tolist()
+        handlers = self.handlers
         
         for _ in range(self.repeat_count):
             if not self.running:
                 break
                 
             last_time = 0
-            for i, action in enumerate(self.actions):
+            scheduled = None  # Script time of the current action, including randomized gaps
+            i = 0
+            while i < len(opcodes):
                 if not self.running:
                     break
+                if self.wake_event.is_set() and not self._apply_controls():
+                    break
+                opcode = opcodes[i]
                 
-                # Calculate delay
-                if i > 0:
-                    delay = (action['time'] - last_time) / self.speed_factor
+                # Wait for the action's absolute deadline; a stability wait replaces
+                # the recorded delay before it, so it starts right away
+                if scheduled is None or opcode == OP_WAIT_STABLE:
+                    scheduled = times[i]
+                    self.scheduler.rebase(scheduled)
+                else:
+                    gap = max(0, times[i] - last_time)
                     
                     # Add randomization if enabled
                     if self.randomize:
                         random_factor = 1.0 + (np.random.random() * 2 - 1) * self.randomize_factor
-                        delay *= random_factor
+                        gap *= random_factor
                     
-                    time.sleep(max(0, delay))
+                    scheduled += gap
+                    if not self._wait_until_due(i, scheduled):
+                        break
                 
-                # Execute action
-                self._execute_action(action)
-                last_time = action['time']
+                # Execute action; handlers return a jump target or None for the next action
+                try:
+                    target = handlers[opcode](i)
+                    
+                    # The action may have changed the screen, so drop the shared capture
+                    get_frame_provider().invalidate()
+                except Exception as e:
+                    print(f"Error executing action: {e}")
+                    target = None
+                last_time = times[i]
+                if opcode == OP_WAIT_STABLE:
+                    # Later actions are timed from when the screen settled
+                    self.scheduler.rebase(scheduled)
                 
                 # Emit signal for UI update
                 self.action_played.emit(i)
+                if target == ABORT:
+                    self.running = False
+                    break
+                if target is not None:
+                    # A jump restarts the schedule at its target, so skipped or
+                    # repeated actions add no recorded delay
+                    scheduled = None
+                i = i + 1 if target is None else target
         
+        self.timing_report = self.scheduler.report()
         self.running = False
+        if self.stop_requested_ns is not None:
+            self.stop_latency = (time.perf_counter_ns() - self.stop_requested_ns) / 1e9
         self.playback_finished.emit()
     
-    def _execute_action(self, action):
+    def _wait_until_due(self, index, scheduled):
+        """Wait for an action's deadline; returns False if playback was stopped meanwhile.
+        
+        The wait sleeps on wake_event rather than time.sleep(), so stop() ends a
+        long recorded idle immediately instead of after it has elapsed.
+        """
+        while self.scheduler.wait_for(index, scheduled, self.wake_event) is None:
+            if not self._apply_controls():
+                return False
+        return True
+    
+    def _apply_controls(self):
+        """Act on pause and speed requests; returns False once playback has been stopped.
+        
+        Both are applied by rebasing the scheduler, so resuming or changing speed
+        continues from the same script position instead of catching up.
+        """
+        while True:
+            self.wake_event.clear()
+            if not self.running:
+                return False
+            
+            speed_factor = self.pending_speed
+            if speed_factor is not None:
+                self.pending_speed = None
+                self.speed_factor = speed_factor
+                self.scheduler.set_speed(speed_factor)
+            
+            if not self.paused:
+                return True
+            
+            # Hold until resume(), stop() or set_speed() wakes us, then push the schedule back
+            paused_at = time.perf_counter_ns()
+            self.wake_event.wait()
+            self.scheduler.shift(time.perf_counter_ns() - paused_at)
+    
+    def _click(self, index):
+        x, y = self.x[index], self.y[index]
+        if self.randomize:
+            # Calculate pixel radius for randomization (randomize_factor * 30 gives us the pixel radius)
+            pixel_radius = int(self.randomize_factor * 30)
+            
+            # Add slight randomization to click position
+            x += int((np.random.random() * 2 - 1) * pixel_radius)
+            y += int((np.random.random() * 2 - 1) * pixel_radius)
+        self.input.click(x, y, self.program.strings[self.button[index]])
+    
+    def _move(self, index):
+        self.input.move(self.x[index], self.y[index])
+    
+    def _keypress(self, index):
+        self.input.press(self.program.strings[self.arg[index]])
+    
+    def _keydown(self, index):
+        self.input.key_down(self.program.strings[self.arg[index]])
+    
+    def _keyup(self, index):
+        self.input.key_up(self.program.strings[self.arg[index]])
+    
+    def _scroll(self, index):
+        self.input.scroll(self.arg[index])
+    
+    def _wait_stable(self, index):
+        action = self.program.extras[self.arg[index]]
+        if not wait_until_stable(action.get('region'), action.get('stable_ms', STABLE_REGION_MS),
+                                 action.get('timeout', 10.0), cancel_event=self.stop_event):
+            if not self.stop_event.is_set():
+                print("Screen did not settle before the stability wait timed out")
+    
+    def _checkpoint(self, index):
+        """Compare the screen with a recorded checkpoint; returns a jump target, ABORT or None."""
+        action = self.program.extras[self.arg[index]]
         try:
-            if action['type'] == 'click':
-                if self.randomize:
-                    # Calculate pixel radius for randomization (randomize_factor * 30 gives us the pixel radius)
-                    pixel_radius = int(self.randomize_factor * 30)
-                    
-                    # Add slight randomization to click position
-                    rand_x = action['x'] + int((np.random.random() * 2 - 1) * pixel_radius)
-                    rand_y = action['y'] + int((np.random.random() * 2 - 1) * pixel_radius)
-                    pyautogui.click(rand_x, rand_y, button=action.get('button', 'left'))
-                else:
-                    pyautogui.click(action['x'], action['y'], button=action.get('button', 'left'))
-                    
-            elif action['type'] == 'move':
-                pyautogui.moveTo(action['x'], action['y'])
-                
-            elif action['type'] == 'keypress':
-                pyautogui.press(action['key'])
-                
-            elif action['type'] == 'keydown':
-                pyautogui.keyDown(action['key'])
-                
-            elif action['type'] == 'keyup':
-                pyautogui.keyUp(action['key'])
-                
-            elif action['type'] == 'scroll':
-                pyautogui.scroll(action['amount'])
+            matched, distance = check_checkpoint(action)
         except Exception as e:
-            print(f"Error executing action: {e}")
+            print(f"Error checking checkpoint: {e}")
+            return None
+        if matched:
+            return None
+        
+        self.checkpoint_failed.emit(index, distance)
+        on_mismatch = action.get('on_mismatch', 'abort')
+        if on_mismatch == 'goto':
+            target = action.get('goto_index', 0)
+            if 0 <= target < len(self.program):
+                return target
+            print(f"Checkpoint jump target {target} is out of range")
+        elif on_mismatch == 'pause':
+            self.pause()
+            return None
+        elif on_mismatch == 'continue':
+            return None
+        return ABORT
+    
+    def _other(self, index):
+        # Unknown action types are skipped, as before compilation
+        pass
+    
+    def _anchor_click(self, index):
+        """Click at an offset from the center of a template located on screen."""
+        action = self.program.extras[self.arg[index]]
+        if self.image_recognition is None:
+            self.image_recognition = ImageRecognitionTool()
+        
+        template_name = f"anchor:{action['template']}"
+        if template_name not in self.image_recognition.templates:
+            if not self.image_recognition.load_template(template_name, action['template']):
+                print(f"Error loading anchor image: {action['template']}")
+                return
+        
+        result = self.image_recognition.find_anchor(template_name, action.get('confidence', 0.8))
+        if result is not None:
+            x = result[0] + action.get('offset_x', 0)
+            y = result[1] + action.get('offset_y', 0)
+        elif 'x' in action and 'y' in action:
+            # Recorded anchors keep the original position as a fallback
+            x, y = action['x'], action['y']
+        else:
+            print(f"Anchor not found on screen: {action['template']}")
+            return
+        
+        if self.randomize:
+            pixel_radius = int(self.randomize_factor * 30)
+            x += int((np.random.random() * 2 - 1) * pixel_radius)
+            y += int((np.random.random() * 2 - 1) * pixel_radius)
+        self.input.click(x, y, action.get('button', 'left'))
+    
+    def pause(self):
+        if self.running and not self.paused:
+            self.paused = True
+            self.wake_event.set()
+            self.paused_changed.emit(True)
+    
+    def resume(self):
+        if self.paused:
+            self.paused = False
+            self.wake_event.set()
+            self.paused_changed.emit(False)
+    
+    def toggle_pause(self):
+        if self.paused:
+            self.resume()
+        else:
+            self.pause()
+    
+    def set_speed(self, speed_factor):
+        """Change the playback speed while running; takes effect before the next action."""
+        if speed_factor <= 0:
+            raise ValueError("Speed factor must be positive")
+        if not self.running:
+            self.speed_factor = speed_factor
+            self.scheduler.speed_factor = speed_factor
+            return
+        self.pending_speed = speed_factor
+        self.wake_event.set()
     
     def stop(self):
-        self.running = False
\ No newline at end of file
+        """Ask playback to end; returns at once and playback_finished follows shortly."""
+        if self.running and self.stop_requested_ns is None:
+            self.stop_requested_ns = time.perf_counter_ns()
+        self.running = False
+        self.stop_event.set()
+        self.wake_event.set()
\ No newline at end of file
@@ -1,15 +1,21 @@
 """
 Recording functionality for the Auto Click application.
 """
+import os
 import time
 import pyautogui
+import cv2
 from PyQt5.QtCore import QThread, pyqtSignal
 import json
 
+from autoclick.config import ANCHOR_PATCH_SIZE, ANCHOR_MIN_CONTRAST
+from autoclick.core.frame_cache import get_frame_provider
+from autoclick.core.checkpoints import capture_checkpoint
+
 class RecordingThread(QThread):
     action_recorded = pyqtSignal(dict)
     
-    def __init__(self):
+    def __init__(self, capture_anchors=False, patch_store=None):
         super().__init__()
         self.running = False
         self.actions = []
@@ -19,6 +25,9 @@ class RecordingThread(QThread):
         self.movement_threshold = 5  # pixels
         self.movement_interval = 0.1  # seconds
         self.last_movement_time = 0
+        self.capture_anchors = capture_anchors  # Record clicks as anchor clicks on the patch under the cursor
+        self.patch_store = patch_store
+        self.anchor_size = ANCHOR_PATCH_SIZE
     
     def run(self):
         self.running = True
@@ -63,6 +72,12 @@ class RecordingThread(QThread):
                 serializable_kwargs[key] = str(value).split('.')[-1].lower()
             else:
                 serializable_kwargs[key] = value
+        
+        if action_type == 'click' and self.capture_anchors and self.patch_store is not None:
+            anchor = self._capture_anchor(serializable_kwargs['x'], serializable_kwargs['y'])
+            if anchor is not None:
+                action_type = 'anchor_click'
+                serializable_kwargs.update(anchor)
                 
         action = {
             'type': action_type,
@@ -71,11 +86,63 @@ class RecordingThread(QThread):
         }
         self.actions.append(action)
         self.action_recorded.emit(action)
+    
+    def add_checkpoint(self, region=None):
+        """Record the perceptual hash of the screen (or region) for playback to verify."""
+        try:
+            self.add_action('checkpoint', on_mismatch='abort', **capture_checkpoint(region))
+        except Exception as e:
+            print(f"Error capturing checkpoint: {e}")
+    
+    def _capture_anchor(self, x, y):
+        """Store the screen patch around a click and return the anchor fields, or None.
+        
+        The recorded x/y stay in the action as a fallback for playback.
+        """
+        try:
+            frame = get_frame_provider().get_bgr_frame()
+            screen_h, screen_w = frame.shape[:2]
+            half = self.anchor_size // 2
+            x0, y0 = max(0, x - half), max(0, y - half)
+            x1, y1 = min(screen_w, x + half), min(screen_h, y + half)
+            patch = frame[y0:y1, x0:x1]
+            if min(patch.shape[:2]) < half:
+                return None
+            
+            # Flat patches match everywhere, so they make useless anchors
+            if cv2.cvtColor(patch, cv2.COLOR_BGR2GRAY).std() < ANCHOR_MIN_CONTRAST:
+                return None
+            
+            template_path = self.patch_store.add(patch)
+            if template_path is None:
+                return None
+            return {
+                'template': template_path,
+                'offset_x': x - (x0 + (x1 - x0) // 2),
+                'offset_y': y - (y0 + (y1 - y0) // 2)
+            }
+        except Exception as e:
+            print(f"Error capturing anchor: {e}")
+            return None
 
 def format_action(action):
     """Format an action for display in the UI."""
     if action['type'] == 'click':
         return f"[{action['time']:.2f}s] Click at ({action['x']}, {action['y']})"
+    elif action['type'] == 'anchor_click':
+        return (f"[{action['time']:.2f}s] Click at ({action.get('offset_x', 0):+d}, {action.get('offset_y', 0):+d}) "
+                f"from '{os.path.basename(action['template'])}'")
+    elif action['type'] == 'wait_stable':
+        region = action.get('region')
+        area = f"region ({region[0]}, {region[1]}, {region[2]}x{region[3]})" if region else "screen"
+        return f"[{action['time']:.2f}s] Wait until {area} is stable for {action.get('stable_ms', 0)} ms"
+    elif action['type'] == 'checkpoint':
+        on_mismatch = action.get('on_mismatch', 'abort')
+        if on_mismatch == 'goto':
+            on_mismatch = f"go to action {action.get('goto_index', 0) + 1}"
+        region = action.get('region')
+        area = f" on region ({region[0]}, {region[1]}, {region[2]}x{region[3]})" if region else ""
+        return f"[{action['time']:.2f}s] Checkpoint{area} (on mismatch: {on_mismatch})"
     elif action['type'] == 'move':
         return f"[{action['time']:.2f}s] Move to ({action['x']}, {action['y']})"
     elif action['type'] == 'keypress':
@@ -0,0 +1,91 @@
+"""
+Playback timing for the Auto Click application.
+"""
+import time
+
+import numpy as np
+
+from autoclick.config import SCHEDULER_SPIN_MS
+
+class DeadlineScheduler:
+    """Turns script timestamps into absolute perf_counter_ns() deadlines.
+    
+    Every deadline is computed from one origin instead of from the end of the
+    previous action, so time spent executing actions never accumulates as drift.
+    Waits sleep until spin_ms before the deadline and busy-wait the rest, which
+    avoids the OS sleep granularity without burning a core between actions.
+    """
+    
+    def __init__(self, speed_factor=1.0, spin_ms=SCHEDULER_SPIN_MS):
+        self.speed_factor = speed_factor
+        self.spin_ns = int(spin_ms * 1000000)
+        self.origin_ns = 0
+        self.origin_time = 0.0
+        self.lateness_ns = []  # (action index, ns past the deadline the action was released)
+    
+    def start(self, script_time=0.0):
+        """Anchor script_time (seconds into the script) to now."""
+        self.rebase(script_time)
+        self.lateness_ns = []
+    
+    def rebase(self, script_time):
+        """Re-anchor script_time to now, e.g. after a wait of unknown length or a jump."""
+        self.origin_ns = time.perf_counter_ns()
+        self.origin_time = script_time
+    
+    def set_speed(self, speed_factor):
+        """Change speed from now on without moving the current script position.
+        
+        Time already played keeps its old rate, so nothing fires in a burst and
+        the remaining gaps are scaled by the new speed only.
+        """
+        now = time.perf_counter_ns()
+        self.origin_time += (now - self.origin_ns) * self.speed_factor / 1e9
+        self.origin_ns = now
+        self.speed_factor = speed_factor
+    
+    def shift(self, delay_ns):
+        """Push every remaining deadline back by delay_ns, e.g. the length of a pause."""
+        self.origin_ns += delay_ns
+    
+    def deadline_ns(self, script_time):
+        return self.origin_ns + int((script_time - self.origin_time) * 1e9 / self.speed_factor)
+    
+    def wait_until(self, deadline_ns, wake_event=None):
+        """Block until deadline_ns; returns ns of lateness, or None as soon as wake_event is set."""
+        while True:
+            remaining = deadline_ns - time.perf_counter_ns()
+            if remaining <= self.spin_ns:
+                break
+            sleep_s = (remaining - self.spin_ns) / 1e9
+            if wake_event is not None:
+                if wake_event.wait(sleep_s):
+                    return None
+            else:
+                time.sleep(sleep_s)
+        
+        while time.perf_counter_ns() < deadline_ns:
+            pass
+        return time.perf_counter_ns() - deadline_ns
+    
+    def wait_for(self, index, script_time, wake_event=None):
+        """Wait for the deadline of the action at script_time and record its lateness."""
+        lateness = self.wait_until(self.deadline_ns(script_time), wake_event)
+        if lateness is not None:
+            self.lateness_ns.append((index, lateness))
+        return lateness
+    
+    def report(self):
+        """Summarize recorded lateness in milliseconds."""
+        if not self.lateness_ns:
+            return {'actions': 0, 'mean_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0, 'worst_action': None}
+        indices, lateness = zip(*self.lateness_ns)
+        lateness = np.array(lateness, np.float64) / 1e6
+        worst = int(np.argmax(lateness))
+        return {
+            'actions': len(lateness),
+            'mean_ms': float(lateness.mean()),
+            'p99_ms': float(np.percentile(lateness, 99)),
+            'max_ms': float(lateness[worst]),
+            'worst_action': indices[worst]
+        }
\ No newline at end of file
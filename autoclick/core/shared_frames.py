@@ -0,0 +1,41 @@
+"""
+Shared-memory screen frames for the Auto Click application.
+"""
+from multiprocessing import shared_memory
+
+import numpy as np
+
+class SharedFrame:
+    """Copies a frame into a named shared memory block so worker processes can read it without pickling.
+    
+    Workers receive only the small spec tuple and map the block with attach_shared_frame().
+    """
+    
+    def __init__(self, frame):
+        self.shm = shared_memory.SharedMemory(create=True, size=max(1, frame.nbytes))
+        array = np.ndarray(frame.shape, dtype=frame.dtype, buffer=self.shm.buf)
+        array[...] = frame
+        del array  # Release the buffer export so close() can succeed later
+        self.spec = (self.shm.name, frame.shape, frame.dtype.str)
+    
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+_attached = {}  # Worker side: name -> (SharedMemory, ndarray) of the most recent frame
+
+def attach_shared_frame(spec):
+    """Map a SharedFrame inside a worker process, keeping only the latest frame mapped."""
+    name, shape, dtype = spec
+    if name not in _attached:
+        for old_name in list(_attached):
+            shm, array = _attached.pop(old_name)
+            del array
+            shm.close()
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13 has no track argument; the pool shares the parent's resource tracker
+            shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = (shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf))
+    return _attached[name][1]
\ No newline at end of file
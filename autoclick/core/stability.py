@@ -0,0 +1,62 @@
+"""
+Screen stability waits for the Auto Click application.
+"""
+import time
+import threading
+
+import cv2
+import numpy as np
+
+from autoclick.config import (STABLE_REGION_MS, STABILITY_SAMPLE_STEP, STABILITY_THRESHOLD,
+                              PIXEL_POLL_INTERVAL)
+from autoclick.core.frame_cache import get_frame_provider
+from autoclick.core.image_recognition import region_bounds
+
+def region_thumbnail(frame, bounds, sample_step=STABILITY_SAMPLE_STEP):
+    """Return a small grayscale copy of the (x0, y0, x1, y1) part of a frame."""
+    x0, y0, x1, y1 = bounds
+    crop = np.ascontiguousarray(frame[y0:y1, x0:x1, :3])
+    gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+    h, w = gray.shape
+    return cv2.resize(gray, (max(1, w // sample_step), max(1, h // sample_step)),
+                      interpolation=cv2.INTER_AREA)
+
+def wait_until_stable(region=None, stable_ms=STABLE_REGION_MS, timeout=10.0, threshold=STABILITY_THRESHOLD,
+                      interval=PIXEL_POLL_INTERVAL, cancel_event=None, frame_provider=None):
+    """Block until region (left, top, width, height) has stopped changing for stable_ms.
+    
+    Consecutive frames are shrunk by STABILITY_SAMPLE_STEP and compared; the region
+    counts as changed when any sample differs by more than threshold gray levels,
+    which ignores capture noise and subpixel font rendering.
+    Returns True once stable, False on timeout or when cancel_event is set.
+    A timeout of None waits indefinitely.
+    """
+    frame_provider = frame_provider or get_frame_provider()
+    event = cancel_event or threading.Event()
+    start = time.monotonic()
+    deadline = None if timeout is None else start + timeout
+    stable_for = stable_ms / 1000.0
+    
+    previous = None
+    last_change = start
+    while not event.is_set():
+        frame = frame_provider.get_frame(max_age=interval)
+        now = time.monotonic()
+        thumbnail = region_thumbnail(frame, region_bounds(region, frame.shape))
+        if previous is None or previous.shape != thumbnail.shape or \
+                cv2.absdiff(previous, thumbnail).max(initial=0) > threshold:
+            last_change = now
+        previous = thumbnail
+        
+        if now - last_change >= stable_for:
+            return True
+        
+        delay = min(interval, last_change + stable_for - now)
+        if deadline is not None:
+            remaining = deadline - now
+            if remaining <= 0:
+                return False
+            delay = min(delay, remaining)
+        event.wait(delay)
+    
+    return False
\ No newline at end of file
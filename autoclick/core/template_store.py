@@ -0,0 +1,92 @@
+"""
+Persistent template store for the Auto Click application.
+"""
+import hashlib
+import os
+
+import cv2
+import numpy as np
+
+from autoclick.config import PYRAMID_LEVELS
+from autoclick.core.image_recognition import downscale
+from autoclick.utils.system_utils import get_app_data_path
+
+class TemplateStore:
+    """Caches decoded and preprocessed templates on disk, keyed by the image's content hash.
+    
+    Each entry is a directory of .npy files that are memory-mapped on load:
+    color (BGR), gray, mask (only for images with transparency) and
+    pyramid_<level> downscaled copies of the color image.
+    """
+    
+    def __init__(self, root=None, pyramid_levels=PYRAMID_LEVELS):
+        self.root = root or os.path.join(get_app_data_path(), 'templates')
+        self.pyramid_levels = pyramid_levels
+        os.makedirs(self.root, exist_ok=True)
+    
+    def content_hash(self, image_path):
+        sha = hashlib.sha256()
+        with open(image_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                sha.update(chunk)
+        return sha.hexdigest()
+    
+    def load(self, image_path):
+        """Return the variants dict for an image file, or None if it cannot be decoded.
+        
+        The image is only decoded and preprocessed the first time its content is seen.
+        """
+        key = self.content_hash(image_path)
+        variants = self.get(key)
+        if variants is not None:
+            return variants
+        
+        image = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
+        if image is None:
+            return None
+        return self.add_image(key, image)
+    
+    def get(self, key):
+        """Memory-map a stored entry, or return None if it is missing."""
+        entry_dir = os.path.join(self.root, key)
+        if not os.path.exists(os.path.join(entry_dir, 'color.npy')):
+            return None
+        
+        variants = {'key': key}
+        for filename in os.listdir(entry_dir):
+            if filename.endswith('.npy'):
+                variants[filename[:-4]] = np.load(os.path.join(entry_dir, filename), mmap_mode='r')
+        return variants
+    
+    def add_image(self, key, image):
+        """Preprocess a decoded image (gray, BGR or BGRA) and store its variants under key."""
+        if image.dtype != np.uint8:
+            image = cv2.convertScaleAbs(image, alpha=255.0 / max(1, image.max()))
+        
+        arrays = {}
+        if image.ndim == 2:
+            color = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        elif image.shape[2] == 4:
+            color = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+            alpha = image[:, :, 3]
+            if alpha.min() < 255:
+                arrays['mask'] = np.where(alpha > 0, 255, 0).astype(np.uint8)
+        else:
+            color = image
+        
+        arrays['color'] = color
+        arrays['gray'] = cv2.cvtColor(color, cv2.COLOR_BGR2GRAY)
+        for level in range(1, self.pyramid_levels + 1):
+            arrays[f'pyramid_{level}'] = downscale(color, 1 << level)
+        
+        entry_dir = os.path.join(self.root, key)
+        os.makedirs(entry_dir, exist_ok=True)
+        # Write color.npy last so a half-written entry is never picked up by get()
+        for name in sorted(arrays, key=lambda name: name == 'color'):
+            path = os.path.join(entry_dir, f'{name}.npy')
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                np.save(f, np.ascontiguousarray(arrays[name]))
+            os.replace(tmp_path, path)
+        
+        return self.get(key)
\ No newline at end of file
@@ -0,0 +1,122 @@
+"""
+Screen trigger watcher for the Auto Click application.
+"""
+import threading
+import time
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from autoclick.config import WATCHER_INTERVAL, STABLE_REGION_MS
+from autoclick.core.change_detection import ChangeDetector
+from autoclick.core.image_recognition import region_bounds
+from autoclick.core.pixel_checks import PixelChecker
+
+class TriggerWatcher(QThread):
+    """Checks registered screen triggers against one shared capture per tick and reports profiles to run.
+    
+    A trigger is a dict with a 'type' of:
+    - 'image': 'template' path appears ('confidence', optional 'region')
+    - 'pixel': 'pixels' conditions hold (see PixelChecker, 'require' is 'all' or 'any')
+    - 'stable': 'region' has not changed for 'stable_ms' milliseconds
+    
+    Triggers fire once when their condition becomes true and re-arm when it turns
+    false again. A trigger whose region did not change since its last evaluation
+    keeps its previous state without being evaluated.
+    """
+    trigger_fired = pyqtSignal(str)  # Profile id
+    
+    def __init__(self, image_recognition, interval=WATCHER_INTERVAL):
+        super().__init__()
+        self.image_recognition = image_recognition
+        self.frame_provider = image_recognition.frame_provider
+        self.interval = interval
+        self.running = False
+        self.triggers = []
+        self.lock = threading.Lock()
+        self.wake_event = threading.Event()
+        self.change_detector = ChangeDetector()  # Own detector so frames arrive in order
+    
+    def set_profile_triggers(self, profile_id, triggers):
+        """Replace the triggers registered for a profile."""
+        entries = []
+        for trigger in triggers:
+            entry = {'profile_id': profile_id, 'trigger': trigger, 'state': False, 'frame_id': None}
+            if trigger['type'] == 'image':
+                entry['template_name'] = f"trigger:{trigger['template']}"
+                if not self.image_recognition.load_template(entry['template_name'], trigger['template'],
+                                                            trigger.get('mode', 'color')):
+                    print(f"Error loading trigger template: {trigger['template']}")
+                    continue
+            elif trigger['type'] == 'pixel':
+                entry['checker'] = PixelChecker(trigger['pixels'], self.frame_provider)
+            elif trigger['type'] == 'stable':
+                entry['last_change'] = time.monotonic()
+            else:
+                print(f"Unknown trigger type: {trigger['type']}")
+                continue
+            entries.append(entry)
+        
+        with self.lock:
+            self.triggers = [entry for entry in self.triggers if entry['profile_id'] != profile_id] + entries
+    
+    def clear_triggers(self):
+        with self.lock:
+            self.triggers = []
+    
+    def has_triggers(self):
+        with self.lock:
+            return bool(self.triggers)
+    
+    def run(self):
+        self.running = True
+        self.wake_event.clear()
+        
+        while self.running:
+            with self.lock:
+                triggers = list(self.triggers)
+            
+            if triggers:
+                try:
+                    frame, frame_id = self.frame_provider.get_bgr_snapshot(max_age=self.interval)
+                    self.change_detector.update(frame, frame_id)
+                    for entry in triggers:
+                        self._evaluate(entry, frame, frame_id)
+                except Exception as e:
+                    print(f"Error checking triggers: {e}")
+            
+            self.wake_event.wait(self.interval)
+    
+    def stop(self):
+        self.running = False
+        self.wake_event.set()
+    
+    def _evaluate(self, entry, frame, frame_id):
+        trigger = entry['trigger']
+        bounds = region_bounds(trigger.get('region'), frame.shape)
+        if trigger['type'] == 'pixel':
+            checker = entry['checker']
+            xs, ys = checker.xs, checker.ys
+            if len(xs):
+                bounds = (int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1)
+        
+        changed = entry['frame_id'] is None or self.change_detector.changed_since(entry['frame_id'], bounds)
+        entry['frame_id'] = frame_id
+        
+        if trigger['type'] == 'stable':
+            now = time.monotonic()
+            if changed:
+                entry['last_change'] = now
+            state = now - entry['last_change'] >= trigger.get('stable_ms', STABLE_REGION_MS) / 1000.0
+        elif not changed:
+            return  # Nothing under this trigger moved, so its state cannot have changed
+        elif trigger['type'] == 'image':
+            state = self.image_recognition.find_in_frame(
+                entry['template_name'], frame, frame_id, trigger.get('confidence', 0.8),
+                region=trigger.get('region')) is not None
+        else:
+            checker = entry['checker']
+            state = checker.all_match(frame) if trigger.get('require', 'all') == 'all' else checker.any_match(frame)
+        
+        if state and not entry['state']:
+            self.trigger_fired.emit(entry['profile_id'])
+        entry['state'] = state
\ No newline at end of file
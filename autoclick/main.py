@@ -8,6 +8,7 @@ from PyQt5.QtGui import QIcon
 from autoclick.config import APP_ICON
 from autoclick.database.manager import DatabaseManager
 from autoclick.core.image_recognition import ImageRecognitionTool
+from autoclick.core.template_store import TemplateStore
 from autoclick.ui.main_window import MainWindow
 from autoclick.utils.system_utils import ensure_app_data_dir
 
@@ -25,7 +26,7 @@ def main():
     
     # Initialize database and image recognition
     db_manager = DatabaseManager()
-    image_recognition = ImageRecognitionTool()
+    image_recognition = ImageRecognitionTool(template_store=TemplateStore())
     
     # Create and show main window
     window = MainWindow(db_manager, image_recognition)
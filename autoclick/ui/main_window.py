@@ -16,6 +16,7 @@ from autoclick.ui.scripts_tab import ScriptsTab
 from autoclick.ui.profiles_tab import ProfilesTab
 from autoclick.ui.settings_tab import SettingsTab
 from autoclick.core.playback import PlaybackThread
+from autoclick.core.watcher import TriggerWatcher
 
 class MainWindow(QMainWindow):
     def __init__(self, db_manager, image_recognition):
@@ -27,6 +28,8 @@ class MainWindow(QMainWindow):
         self.role = None
         self.permissions = []
         self.playback_thread = None
+        self.trigger_watcher = None
+        self.playback_profile_id = None  # Profile the main playback thread is running
         
         # Show login dialog first
         self.show_login_dialog()
@@ -52,7 +55,7 @@ class MainWindow(QMainWindow):
         self.tabs = QTabWidget()
         
         # Create recorder tab first (needed by other tabs)
-        self.recorder_tab = RecorderTab(self.db_manager, self.user_id, self.permissions)
+        self.recorder_tab = RecorderTab(self.db_manager, self.user_id, self.permissions, self.image_recognition)
         
         # Create other tabs
         self.scripts_tab = ScriptsTab(self.db_manager, self.user_id, self.permissions, self.recorder_tab)
@@ -79,6 +82,12 @@ class MainWindow(QMainWindow):
         # Setup global hotkeys
         keyboard.on_press(self.on_key_press)
         
+        # Setup screen triggers
+        self.trigger_watcher = TriggerWatcher(self.image_recognition)
+        self.trigger_watcher.trigger_fired.connect(self.on_trigger_fired)
+        self.profiles_tab.profiles_changed.connect(self.update_triggers)
+        self.update_triggers()
+        
         # Load settings
         self.load_settings()
     
@@ -136,6 +145,9 @@ class MainWindow(QMainWindow):
         self.start_record_hotkey = settings.value("start_record_hotkey", "f9")
         self.stop_record_hotkey = settings.value("stop_record_hotkey", "f10")
         self.stop_playback_hotkey = settings.value("stop_playback_hotkey", "esc")
+        self.checkpoint_hotkey = settings.value("checkpoint_hotkey", "f8")
+        self.pause_playback_hotkey = settings.value("pause_playback_hotkey", "f11")
+        self.recorder_tab.checkpoint_hotkey = self.checkpoint_hotkey
     
     def on_key_press(self, event):
         # Check for recording hotkeys
@@ -150,6 +162,10 @@ class MainWindow(QMainWindow):
             if self.recorder_tab.recording_thread and self.recorder_tab.recording_thread.running:
                 self.recorder_tab.toggle_recording()
         
+        elif event.name == self.checkpoint_hotkey and 'record_macros' in self.permissions:
+            # Record a screen checkpoint if recording
+            self.recorder_tab.add_checkpoint()
+        
         # Check for stop playback hotkey
         elif event.name == self.stop_playback_hotkey:
             if self.playback_thread and self.playback_thread.running:
@@ -157,11 +173,22 @@ class MainWindow(QMainWindow):
             elif self.recorder_tab.playback_thread and self.recorder_tab.playback_thread.running:
                 self.recorder_tab.stop_playback()
         
+        # Check for pause playback hotkey
+        elif event.name == self.pause_playback_hotkey:
+            if self.playback_thread and self.playback_thread.running:
+                self.playback_thread.toggle_pause()
+            elif self.recorder_tab.playback_thread and self.recorder_tab.playback_thread.running:
+                self.recorder_tab.toggle_pause()
+        
         # Check for profile hotkeys
         active_profiles = self.profiles_tab.get_active_profiles()
         for profile_id, profile_data in active_profiles.items():
             if event.name == profile_data['hotkey']:
-                self.run_profile(profile_id)
+                if profile_id == self.playback_profile_id and self.playback_thread and self.playback_thread.running:
+                    # The profile's own hotkey pauses and resumes it while it plays
+                    self.playback_thread.toggle_pause()
+                else:
+                    self.run_profile(profile_id)
     
     def run_profile(self, profile_id):
         # Check permission
@@ -171,20 +198,57 @@ class MainWindow(QMainWindow):
         profile = self.db_manager.get_profile(profile_id)
         
         if profile and 'script_content' in profile:
+            # A stopped thread finishes within a few milliseconds; let it exit before replacing it
+            if self.playback_thread and self.playback_thread.isRunning():
+                self.playback_thread.stop()
+                self.playback_thread.wait()
+            
             # Create and start playback thread
             self.playback_thread = PlaybackThread(
                 profile['script_content'],
                 profile['settings'].get('speed', 1.0),
                 profile['settings'].get('repeat', 1),
                 profile['settings'].get('randomize', False),
-                self.settings_tab.get_randomize_factor()
+                self.settings_tab.get_randomize_factor(),
+                self.image_recognition,
+                profile['settings'].get('input_backend')
             )
+            self.playback_profile_id = profile_id
             self.playback_thread.start()
     
     def stop_playback(self):
+        # Called from the hotkey listener, so only signal the thread and let it finish on its own
         if self.playback_thread and self.playback_thread.running:
             self.playback_thread.stop()
-            self.playback_thread.wait()
+    
+    def update_triggers(self):
+        # Register screen triggers of all profiles with the watcher
+        if 'use_image_recognition' not in self.permissions:
+            return
+        
+        self.trigger_watcher.clear_triggers()
+        for profile_id, profile_data in self.profiles_tab.get_active_profiles().items():
+            triggers = profile_data['settings'].get('triggers', [])
+            if triggers:
+                self.trigger_watcher.set_profile_triggers(profile_id, triggers)
+        
+        if self.trigger_watcher.has_triggers() and not self.trigger_watcher.isRunning():
+            self.trigger_watcher.start()
+        elif not self.trigger_watcher.has_triggers() and self.trigger_watcher.isRunning():
+            self.trigger_watcher.stop()
+            self.trigger_watcher.wait()
+    
+    def on_trigger_fired(self, profile_id):
+        # Don't interrupt a profile that is already playing, and keep injected
+        # input out of a recording and away from the recorder's own playback
+        if self.playback_thread and self.playback_thread.running:
+            return
+        recorder = self.recorder_tab
+        if recorder.recording_thread and recorder.recording_thread.running:
+            return
+        if recorder.playback_thread and recorder.playback_thread.running:
+            return
+        self.run_profile(profile_id)
     
     def closeEvent(self, event):
         settings = QSettings("AutoClick", "AutoClickApp")
@@ -204,6 +268,13 @@ class MainWindow(QMainWindow):
             self.playback_thread.stop()
             self.playback_thread.wait()
         
+        if self.trigger_watcher and self.trigger_watcher.isRunning():
+            self.trigger_watcher.stop()
+            self.trigger_watcher.wait()
+        
+        # Stop image recognition worker pools
+        self.image_recognition.shutdown()
+        
         # Close database connection
         self.db_manager.close()
         
@@ -4,10 +4,23 @@ Profiles tab for the Auto Click application.
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                             QListWidget, QListWidgetItem, QDialog, QFormLayout,
                             QLineEdit, QComboBox, QGroupBox, QDoubleSpinBox,
-                            QSpinBox, QCheckBox, QDialogButtonBox, QMessageBox)
-from PyQt5.QtCore import Qt
+                            QSpinBox, QCheckBox, QDialogButtonBox, QMessageBox,
+                            QFileDialog)
+from PyQt5.QtCore import Qt, pyqtSignal
+
+from autoclick.config import INPUT_BACKEND
+from autoclick.core.input_backends import available_input_backends
+
+INPUT_BACKEND_LABELS = {
+    'pyautogui': "PyAutoGUI (compatible)",
+    'pynput': "pynput (no pauses)",
+    'xtest': "XTest (X11, fastest)",
+    'null': "Dry run (no input)"
+}
 
 class ProfilesTab(QWidget):
+    profiles_changed = pyqtSignal()
+    
     def __init__(self, db_manager, user_id, permissions, recorder_tab):
         super().__init__()
         self.db_manager = db_manager
@@ -59,6 +72,7 @@ class ProfilesTab(QWidget):
     
     def load_user_profiles(self):
         self.profiles_list.clear()
+        self.active_profiles = {}
         profiles = self.db_manager.get_user_profiles(self.user_id)
         
         for profile_id, name, hotkey, script_name in profiles:
@@ -74,6 +88,8 @@ class ProfilesTab(QWidget):
                     'script_id': profile['script_id'],
                     'settings': profile['settings']
                 }
+        
+        self.profiles_changed.emit()
     
     def create_profile(self):
         # Check permission
@@ -144,9 +160,43 @@ class ProfilesTab(QWidget):
         settings_layout.addRow("Repeat:", repeat_input)
         settings_layout.addRow("Randomize:", randomize_cb)
         
+        input_backend_combo = QComboBox()
+        for backend_name in available_input_backends():
+            input_backend_combo.addItem(INPUT_BACKEND_LABELS.get(backend_name, backend_name), backend_name)
+        input_backend_combo.setCurrentIndex(max(0, input_backend_combo.findData(INPUT_BACKEND)))
+        settings_layout.addRow("Input method:", input_backend_combo)
+        
         settings_group.setLayout(settings_layout)
         layout.addWidget(settings_group)
         
+        # Optional screen trigger that starts the profile when an image appears
+        trigger_group = QGroupBox("Screen Trigger")
+        trigger_layout = QFormLayout()
+        
+        trigger_image_input = QLineEdit()
+        trigger_image_input.setPlaceholderText("Run when this image appears (optional)")
+        
+        browse_btn = QPushButton("Browse...")
+        browse_btn.clicked.connect(lambda: trigger_image_input.setText(
+            QFileDialog.getOpenFileName(dialog, "Select Trigger Image", "", "Images (*.png *.jpg *.bmp)")[0]
+            or trigger_image_input.text()))
+        
+        trigger_image_row = QHBoxLayout()
+        trigger_image_row.addWidget(trigger_image_input)
+        trigger_image_row.addWidget(browse_btn)
+        
+        trigger_confidence_input = QDoubleSpinBox()
+        trigger_confidence_input.setRange(0.5, 1.0)
+        trigger_confidence_input.setValue(0.8)
+        trigger_confidence_input.setSingleStep(0.05)
+        
+        trigger_layout.addRow("Image:", trigger_image_row)
+        trigger_layout.addRow("Confidence:", trigger_confidence_input)
+        
+        trigger_group.setLayout(trigger_layout)
+        trigger_group.setEnabled('use_image_recognition' in self.permissions)
+        layout.addWidget(trigger_group)
+        
         # Buttons
         button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
         button_box.accepted.connect(dialog.accept)
@@ -168,9 +218,18 @@ class ProfilesTab(QWidget):
             settings = {
                 'speed': speed_input.value(),
                 'repeat': repeat_input.value(),
-                'randomize': randomize_cb.isChecked()
+                'randomize': randomize_cb.isChecked(),
+                'input_backend': input_backend_combo.currentData()
             }
             
+            trigger_image = trigger_image_input.text().strip()
+            if trigger_image:
+                settings['triggers'] = [{
+                    'type': 'image',
+                    'template': trigger_image,
+                    'confidence': trigger_confidence_input.value()
+                }]
+            
             # Save profile
             profile_id = self.db_manager.save_profile(
                 self.user_id,
@@ -4,22 +4,30 @@ Recorder tab for the Auto Click application.
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                             QLabel, QGroupBox, QFormLayout, QLineEdit, QTextEdit,
                             QDoubleSpinBox, QSpinBox, QCheckBox, QListWidget,
-                            QMessageBox, QListWidgetItem)
+                            QMessageBox, QListWidgetItem, QComboBox)
 from PyQt5.QtCore import Qt, QTimer
 
 import pyautogui
 from pynput import mouse, keyboard
 
+from autoclick.config import STABLE_REGION_MS, STABILITY_REGION_SIZE, CHECKPOINT_REGION_SIZE
 from autoclick.ui.widgets import PixelDisplayWidget
+from autoclick.core.frame_cache import get_frame_provider
 from autoclick.core.recording import RecordingThread, format_action
+from autoclick.core.patch_store import PatchStore
+from autoclick.core.checkpoints import CHECKPOINT_ACTIONS, default_max_distance
+from autoclick.core.image_recognition import region_around
 from autoclick.core.playback import PlaybackThread
 
 class RecorderTab(QWidget):
-    def __init__(self, db_manager, user_id, permissions):
+    def __init__(self, db_manager, user_id, permissions, image_recognition=None):
         super().__init__()
         self.db_manager = db_manager
         self.user_id = user_id
         self.permissions = permissions
+        self.image_recognition = image_recognition
+        self.patch_store = None  # Created when anchors are first captured
+        self.checkpoint_hotkey = None  # Set by the main window; this key is not recorded
         
         self.recording_thread = None
         self.playback_thread = None
@@ -91,8 +99,17 @@ class RecorderTab(QWidget):
         button_layout.addWidget(self.record_btn)
         button_layout.addWidget(self.play_btn)
         
+        self.pause_btn = QPushButton("Pause")
+        self.pause_btn.clicked.connect(self.toggle_pause)
+        self.pause_btn.setEnabled(False)
+        button_layout.addWidget(self.pause_btn)
+        
         controls_layout.addLayout(button_layout)
         
+        self.capture_anchors_cb = QCheckBox("Capture click anchors")
+        self.capture_anchors_cb.setToolTip("Store the image under each click so playback can follow moved windows")
+        controls_layout.addWidget(self.capture_anchors_cb)
+        
         # Playback settings
         playback_layout = QFormLayout()
         
@@ -100,6 +117,7 @@ class RecorderTab(QWidget):
         self.speed_input.setRange(0.1, 10.0)
         self.speed_input.setValue(1.0)
         self.speed_input.setSingleStep(0.1)
+        self.speed_input.valueChanged.connect(self.on_speed_changed)
         
         self.repeat_input = QSpinBox()
         self.repeat_input.setRange(1, 9999)
@@ -149,6 +167,11 @@ class RecorderTab(QWidget):
         self.actions_list.itemDoubleClicked.connect(self.edit_action)
         actions_layout.addWidget(self.actions_list)
         
+        self.add_wait_btn = QPushButton("Insert Stability Wait")
+        self.add_wait_btn.setToolTip("Replace the delay before the selected action with a wait for the screen to settle")
+        self.add_wait_btn.clicked.connect(self.insert_stability_wait)
+        actions_layout.addWidget(self.add_wait_btn)
+        
         actions_group.setLayout(actions_layout)
         layout.addWidget(actions_group)
         
@@ -168,6 +191,7 @@ class RecorderTab(QWidget):
         can_play = 'play_macros' in self.permissions
         
         self.record_btn.setEnabled(can_record)
+        self.capture_anchors_cb.setEnabled(can_record and 'use_image_recognition' in self.permissions)
         self.play_btn.setEnabled(can_play and len(self.current_actions) > 0)
         self.save_btn.setEnabled('edit_scripts' in self.permissions and len(self.current_actions) > 0)
     
@@ -177,8 +201,12 @@ class RecorderTab(QWidget):
             self.coord_label.setText(f"X: {x}, Y: {y}")
             
             # Get pixel color
-            pixel_color = pyautogui.screenshot().getpixel((x, y))
-            self.color_label.setText(f"RGB: {pixel_color[0]}, {pixel_color[1]}, {pixel_color[2]}")
+            pixel_color = get_frame_provider().get_pixel(x, y)
+            if pixel_color is None:
+                # The cursor is on a monitor outside the captured one
+                self.color_label.setText("RGB: -")
+            else:
+                self.color_label.setText(f"RGB: {pixel_color[0]}, {pixel_color[1]}, {pixel_color[2]}")
         except Exception as e:
             print(f"Error updating coordinates: {e}")
     
@@ -204,7 +232,10 @@ class RecorderTab(QWidget):
             self.save_btn.setEnabled('edit_scripts' in self.permissions)
         else:
             # Start recording
-            self.recording_thread = RecordingThread()
+            capture_anchors = self.capture_anchors_cb.isEnabled() and self.capture_anchors_cb.isChecked()
+            if capture_anchors and self.patch_store is None:
+                self.patch_store = PatchStore()
+            self.recording_thread = RecordingThread(capture_anchors, self.patch_store)
             self.recording_thread.action_recorded.connect(self.on_action_recorded)
             
             # Clear previous recording
@@ -235,6 +266,9 @@ class RecorderTab(QWidget):
             if not self.recording_thread or not self.recording_thread.running:
                 return False
             
+            if (getattr(key, 'char', None) or str(key).replace('Key.', '')) == self.checkpoint_hotkey:
+                return True
+            
             try:
                 # For normal characters
                 key_char = key.char
@@ -311,6 +345,84 @@ class RecorderTab(QWidget):
             key_input.setText(action['key'])
             form.addRow("Key:", key_input)
             
+        elif action['type'] == 'checkpoint':
+            mismatch_input = QComboBox()
+            for option in CHECKPOINT_ACTIONS:
+                mismatch_input.addItem(option.capitalize(), option)
+            mismatch_input.setCurrentIndex(max(0, mismatch_input.findData(action.get('on_mismatch', 'abort'))))
+            
+            goto_input = QSpinBox()
+            goto_input.setRange(1, len(self.current_actions))
+            goto_input.setValue(action.get('goto_index', 0) + 1)
+            
+            # The hash was taken from the recorded area, so only the tolerance is editable
+            region = action.get('region')
+            if 'max_distance' in action:
+                max_distance = action['max_distance']
+            elif region:
+                max_distance = default_max_distance(region[2], region[3])
+            else:
+                screen_w, screen_h = pyautogui.size()
+                max_distance = default_max_distance(screen_w, screen_h)
+            
+            distance_input = QSpinBox()
+            distance_input.setRange(0, 128)
+            distance_input.setValue(max_distance)
+            
+            form.addRow("On mismatch:", mismatch_input)
+            form.addRow("Go to action:", goto_input)
+            form.addRow("Tolerance (bits):", distance_input)
+            form.addRow("Area:", QLabel(f"({region[0]}, {region[1]}, {region[2]}x{region[3]})" if region
+                                        else "Whole screen"))
+        
+        elif action['type'] == 'wait_stable':
+            stable_input = QSpinBox()
+            stable_input.setRange(50, 60000)
+            stable_input.setSuffix(" ms")
+            stable_input.setValue(action.get('stable_ms', STABLE_REGION_MS))
+            
+            timeout_input = QDoubleSpinBox()
+            timeout_input.setRange(0.5, 600.0)
+            timeout_input.setSuffix(" s")
+            timeout_input.setValue(action.get('timeout', 10.0))
+            
+            region = action.get('region')
+            whole_screen_input = QCheckBox("Watch the whole screen")
+            whole_screen_input.setChecked(region is None)
+            region_inputs = []
+            for value in region or (0, 0, STABILITY_REGION_SIZE, STABILITY_REGION_SIZE):
+                region_input = QSpinBox()
+                region_input.setRange(0, 9999)
+                region_input.setValue(int(value))
+                region_input.setEnabled(region is not None)
+                whole_screen_input.toggled.connect(lambda checked, widget=region_input: widget.setEnabled(not checked))
+                region_inputs.append(region_input)
+            
+            form.addRow("Stable for:", stable_input)
+            form.addRow("Timeout:", timeout_input)
+            form.addRow("Region:", whole_screen_input)
+            for label, region_input in zip(("Left:", "Top:", "Width:", "Height:"), region_inputs):
+                form.addRow(label, region_input)
+        
+        elif action['type'] == 'anchor_click':
+            x_input = QSpinBox()
+            x_input.setRange(-9999, 9999)
+            x_input.setValue(action.get('offset_x', 0))
+            
+            y_input = QSpinBox()
+            y_input.setRange(-9999, 9999)
+            y_input.setValue(action.get('offset_y', 0))
+            
+            confidence_input = QDoubleSpinBox()
+            confidence_input.setRange(0.5, 1.0)
+            confidence_input.setSingleStep(0.05)
+            confidence_input.setValue(action.get('confidence', 0.8))
+            
+            form.addRow("Anchor image:", QLabel(action['template']))
+            form.addRow("X offset:", x_input)
+            form.addRow("Y offset:", y_input)
+            form.addRow("Confidence:", confidence_input)
+        
         layout.addLayout(form)
         
         # Add buttons
@@ -328,6 +440,21 @@ class RecorderTab(QWidget):
                 action['y'] = y_input.value()
             elif action['type'] == 'keypress':
                 action['key'] = key_input.text()
+            elif action['type'] == 'checkpoint':
+                action['on_mismatch'] = mismatch_input.currentData()
+                action['goto_index'] = goto_input.value() - 1
+                action['max_distance'] = distance_input.value()
+            elif action['type'] == 'wait_stable':
+                action['stable_ms'] = stable_input.value()
+                action['timeout'] = timeout_input.value()
+                if whole_screen_input.isChecked():
+                    action.pop('region', None)
+                else:
+                    action['region'] = [region_input.value() for region_input in region_inputs]
+            elif action['type'] == 'anchor_click':
+                action['offset_x'] = x_input.value()
+                action['offset_y'] = y_input.value()
+                action['confidence'] = confidence_input.value()
                 
             # Update the list item
             item.setText(format_action(action))
@@ -336,6 +463,57 @@ class RecorderTab(QWidget):
             # Update the action in the list
             self.current_actions[index] = action
     
+    def add_checkpoint(self):
+        # Called from the checkpoint hotkey while recording. Only the area around
+        # the cursor is hashed: a dialog flips too few bits of a whole-screen hash
+        if self.recording_thread and self.recording_thread.running:
+            x, y = pyautogui.position()
+            self.recording_thread.add_checkpoint(region_around(x, y, CHECKPOINT_REGION_SIZE))
+    
+    def insert_stability_wait(self):
+        if self.recording_thread and self.recording_thread.running:
+            return
+        
+        # Insert before the selected action, or at the end when nothing is selected
+        index = self.actions_list.currentRow()
+        if index < 0:
+            index = len(self.current_actions)
+        
+        # Playback skips the recorded delay before a stability wait, so giving it
+        # the time of the following action drops the whole gap
+        if index < len(self.current_actions):
+            wait_time = self.current_actions[index]['time']
+        elif self.current_actions:
+            wait_time = self.current_actions[-1]['time']
+        else:
+            wait_time = 0.0
+        
+        action = {
+            'type': 'wait_stable',
+            'time': wait_time,
+            'stable_ms': STABLE_REGION_MS,
+            'timeout': 10.0
+        }
+        
+        # Watch the area around the next click; the whole screen rarely settles
+        # while a caret blinks or a clock ticks somewhere else
+        for following in self.current_actions[index:]:
+            if following['type'] in ('click', 'anchor_click') and 'x' in following and 'y' in following:
+                action['region'] = region_around(following['x'], following['y'], STABILITY_REGION_SIZE)
+                break
+        
+        # Checkpoints that jump past the insertion point keep pointing at the same action
+        for row, other in enumerate(self.current_actions):
+            if other['type'] == 'checkpoint' and other.get('goto_index', 0) >= index:
+                other['goto_index'] = other.get('goto_index', 0) + 1
+                self.actions_list.item(row).setText(format_action(other))
+        
+        self.current_actions.insert(index, action)
+        item = QListWidgetItem(format_action(action))
+        item.setData(Qt.UserRole, action)
+        self.actions_list.insertItem(index, item)
+        self.apply_permissions()
+    
     def play_recording(self):
         # Check permission
         if 'play_macros' not in self.permissions:
@@ -358,17 +536,34 @@ class RecorderTab(QWidget):
             self.speed_input.value(),
             self.repeat_input.value(),
             self.randomize_cb.isChecked(),
-            self.randomize_radius.value() / 10.0  # Convert to randomize factor
+            self.randomize_radius.value() / 10.0,  # Convert to randomize factor
+            self.image_recognition
         )
         self.playback_thread.playback_finished.connect(self.on_playback_finished)
         self.playback_thread.action_played.connect(self.on_action_played)
+        self.playback_thread.checkpoint_failed.connect(self.on_checkpoint_failed)
+        self.playback_thread.paused_changed.connect(self.on_paused_changed)
         self.playback_thread.start()
+        self.pause_btn.setEnabled(True)
     
     def stop_playback(self):
+        # Don't block the UI; on_playback_finished runs when the thread signals it is done
         if self.playback_thread and self.playback_thread.running:
             self.playback_thread.stop()
-            self.playback_thread.wait()
-            self.on_playback_finished()
+            self.play_btn.setEnabled(False)
+            self.pause_btn.setEnabled(False)
+    
+    def toggle_pause(self):
+        if self.playback_thread and self.playback_thread.running:
+            self.playback_thread.toggle_pause()
+    
+    def on_paused_changed(self, paused):
+        self.pause_btn.setText("Resume" if paused else "Pause")
+    
+    def on_speed_changed(self, value):
+        # Apply speed changes to a running playback right away
+        if self.playback_thread and self.playback_thread.running:
+            self.playback_thread.set_speed(value)
     
     def on_playback_finished(self):
         # Re-enable UI elements
@@ -376,6 +571,9 @@ class RecorderTab(QWidget):
         self.play_btn.setText("Play")
         self.play_btn.clicked.disconnect()
         self.play_btn.clicked.connect(self.play_recording)
+        self.play_btn.setEnabled('play_macros' in self.permissions)
+        self.pause_btn.setText("Pause")
+        self.pause_btn.setEnabled(False)
         
         # Clear selection in actions list
         self.actions_list.clearSelection()
@@ -384,6 +582,12 @@ class RecorderTab(QWidget):
         # Highlight the current action in the list
         self.actions_list.setCurrentRow(index)
     
+    def on_checkpoint_failed(self, index, distance):
+        # Highlight the checkpoint the screen no longer matched
+        if 0 <= index < self.actions_list.count():
+            self.actions_list.setCurrentRow(index)
+        print(f"Checkpoint {index + 1} failed ({distance} bits differ)")
+    
     def clear_recording(self):
         self.current_actions = []
         self.actions_list.clear()
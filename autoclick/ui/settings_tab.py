@@ -97,11 +97,15 @@ class SettingsTab(QWidget):
         self.start_record_hotkey = HotkeyComboBox()
         self.stop_record_hotkey = HotkeyComboBox()
         self.stop_playback_hotkey = HotkeyComboBox()
+        self.checkpoint_hotkey = HotkeyComboBox()
+        self.pause_playback_hotkey = HotkeyComboBox()
         
         # Find default values in the comboboxes
         start_index = self.start_record_hotkey.findData("f9")
         stop_index = self.stop_record_hotkey.findData("f10")
         playback_index = self.stop_playback_hotkey.findData("esc")
+        checkpoint_index = self.checkpoint_hotkey.findData("f8")
+        pause_index = self.pause_playback_hotkey.findData("f11")
         
         if start_index >= 0:
             self.start_record_hotkey.setCurrentIndex(start_index)
@@ -109,10 +113,16 @@ class SettingsTab(QWidget):
             self.stop_record_hotkey.setCurrentIndex(stop_index)
         if playback_index >= 0:
             self.stop_playback_hotkey.setCurrentIndex(playback_index)
+        if checkpoint_index >= 0:
+            self.checkpoint_hotkey.setCurrentIndex(checkpoint_index)
+        if pause_index >= 0:
+            self.pause_playback_hotkey.setCurrentIndex(pause_index)
         
         hotkeys_layout.addRow("Start recording:", self.start_record_hotkey)
         hotkeys_layout.addRow("Stop recording:", self.stop_record_hotkey)
         hotkeys_layout.addRow("Stop playback:", self.stop_playback_hotkey)
+        hotkeys_layout.addRow("Pause/resume playback:", self.pause_playback_hotkey)
+        hotkeys_layout.addRow("Record checkpoint:", self.checkpoint_hotkey)
         
         hotkeys_group.setLayout(hotkeys_layout)
         layout.addWidget(hotkeys_group)
@@ -169,10 +179,14 @@ class SettingsTab(QWidget):
         start_record = settings.value("start_record_hotkey", "f9")
         stop_record = settings.value("stop_record_hotkey", "f10")
         stop_playback = settings.value("stop_playback_hotkey", "esc")
+        checkpoint = settings.value("checkpoint_hotkey", "f8")
+        pause_playback = settings.value("pause_playback_hotkey", "f11")
         
         start_index = self.start_record_hotkey.findData(start_record)
         stop_index = self.stop_record_hotkey.findData(stop_record)
         playback_index = self.stop_playback_hotkey.findData(stop_playback)
+        checkpoint_index = self.checkpoint_hotkey.findData(checkpoint)
+        pause_index = self.pause_playback_hotkey.findData(pause_playback)
         
         if start_index >= 0:
             self.start_record_hotkey.setCurrentIndex(start_index)
@@ -180,6 +194,10 @@ class SettingsTab(QWidget):
             self.stop_record_hotkey.setCurrentIndex(stop_index)
         if playback_index >= 0:
             self.stop_playback_hotkey.setCurrentIndex(playback_index)
+        if checkpoint_index >= 0:
+            self.checkpoint_hotkey.setCurrentIndex(checkpoint_index)
+        if pause_index >= 0:
+            self.pause_playback_hotkey.setCurrentIndex(pause_index)
         
         # Advanced settings
         self.randomize_factor_input.setValue(settings.value("randomize_factor", 0.1, type=float))
@@ -205,6 +223,8 @@ class SettingsTab(QWidget):
         settings.setValue("start_record_hotkey", self.start_record_hotkey.currentData())
         settings.setValue("stop_record_hotkey", self.stop_record_hotkey.currentData())
         settings.setValue("stop_playback_hotkey", self.stop_playback_hotkey.currentData())
+        settings.setValue("checkpoint_hotkey", self.checkpoint_hotkey.currentData())
+        settings.setValue("pause_playback_hotkey", self.pause_playback_hotkey.currentData())
         
         # Advanced settings
         settings.setValue("randomize_factor", self.randomize_factor_input.value())
@@ -254,5 +274,7 @@ class SettingsTab(QWidget):
         return {
             'start_record': self.start_record_hotkey.currentData(),
             'stop_record': self.stop_record_hotkey.currentData(),
-            'stop_playback': self.stop_playback_hotkey.currentData()
+            'stop_playback': self.stop_playback_hotkey.currentData(),
+            'checkpoint': self.checkpoint_hotkey.currentData(),
+            'pause_playback': self.pause_playback_hotkey.currentData()
         }
\ No newline at end of file
@@ -5,7 +5,8 @@ from PyQt5.QtWidgets import QWidget
 from PyQt5.QtCore import Qt, QTimer, QPoint
 from PyQt5.QtGui import QPixmap, QColor, QPainter, QPen
 import pyautogui
-import numpy as np
+
+from autoclick.core.frame_cache import get_frame_provider
 
 class PixelDisplayWidget(QWidget):
     def __init__(self, parent=None):
@@ -26,9 +27,9 @@ class PixelDisplayWidget(QWidget):
             x, y = pyautogui.position()
             self.current_pos = QPoint(x, y)
             
-            # Capture screen area around cursor
-            screenshot = pyautogui.screenshot(region=(x-7, y-7, 15, 15))
-            img = np.array(screenshot)
+            # Read the area around the cursor from the shared screen capture
+            frame = get_frame_provider().get_frame()
+            frame_h, frame_w = frame.shape[:2]
             
             # Create a new pixmap
             self.pixmap = QPixmap(150, 150)
@@ -38,13 +39,12 @@ class PixelDisplayWidget(QWidget):
             qp = QPainter(self.pixmap)
             for i in range(15):
                 for j in range(15):
-                    try:
-                        r, g, b = img[j, i]  # Note: numpy array is [y, x]
+                    px, py = x - 7 + i, y - 7 + j
+                    if 0 <= px < frame_w and 0 <= py < frame_h:
+                        b, g, r = frame[py, px][:3]  # Note: numpy array is [y, x] in BGR order
                         qp.fillRect(i*self.zoom_factor, j*self.zoom_factor, 
                                    self.zoom_factor, self.zoom_factor, 
-                                   QColor(r, g, b))
-                    except IndexError:
-                        pass
+                                   QColor(int(r), int(g), int(b)))
             
             # Draw crosshair at center
             qp.setPen(QPen(Qt.red, 1))
@@ -0,0 +1,73 @@
+"""
+Tests for screen checkpoints.
+"""
+import cv2
+import numpy as np
+
+from autoclick.config import CHECKPOINT_REGION_SIZE
+from autoclick.core.capture import SyntheticCapture
+from autoclick.core.checkpoints import capture_checkpoint, check_checkpoint, default_max_distance
+from autoclick.core.frame_cache import FrameProvider
+from autoclick.core.image_recognition import region_around
+
+def text_screen(seed=1):
+    """A 1080p screen filled with lines of random lowercase words."""
+    rng = np.random.default_rng(seed)
+    screen = np.full((1080, 1920, 3), 245, np.uint8)
+    for y in range(20, 1080, 22):
+        x = 10
+        while x < 1850:
+            length = int(rng.integers(3, 10))
+            word = ''.join(chr(int(c)) for c in rng.integers(97, 122, length))
+            cv2.putText(screen, word, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (20, 20, 20), 1)
+            x += length * 11 + 10
+    return screen
+
+def with_dialog(screen, center, size):
+    """Copy of screen with a modal "Error" dialog of the given size drawn over it."""
+    screen = screen.copy()
+    (cx, cy), (w, h) = center, size
+    x0, y0 = cx - w // 2, cy - h // 2
+    cv2.rectangle(screen, (x0, y0), (x0 + w, y0 + h), (240, 240, 240), -1)
+    cv2.rectangle(screen, (x0, y0), (x0 + w, y0 + h), (90, 90, 90), 2)
+    cv2.rectangle(screen, (x0, y0), (x0 + w, y0 + 28), (180, 110, 30), -1)
+    cv2.putText(screen, 'Error', (x0 + 8, y0 + 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+    cv2.putText(screen, 'Something went wrong', (x0 + 20, y0 + h // 2), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 1)
+    return screen
+
+def record_and_check(recorded, current, region):
+    backend = SyntheticCapture([recorded])
+    provider = FrameProvider(backend=backend)
+    action = capture_checkpoint(region, provider)
+    backend.set_frame(current)
+    provider.invalidate()
+    return check_checkpoint(action, provider)
+
+def test_dialog_fails_cursor_region_checkpoint():
+    screen = text_screen()
+    region = region_around(960, 540, CHECKPOINT_REGION_SIZE)
+    for center in ((960, 540), (1060, 600)):
+        matched, distance = record_and_check(screen, with_dialog(screen, center, (300, 150)), region)
+        assert not matched, distance
+
+def test_caret_passes_cursor_region_checkpoint():
+    screen = text_screen()
+    caret = screen.copy()
+    caret[531:547, 970:972] = 0
+    matched, distance = record_and_check(screen, caret, region_around(960, 540, CHECKPOINT_REGION_SIZE))
+    assert matched, distance
+
+def test_dialog_fails_whole_screen_checkpoint():
+    screen = text_screen()
+    for size in ((500, 300), (300, 150)):
+        matched, distance = record_and_check(screen, with_dialog(screen, (960, 540), size), None)
+        assert not matched, distance
+
+def test_unchanged_screen_passes():
+    screen = text_screen()
+    assert record_and_check(screen, screen.copy(), None)[0]
+    assert record_and_check(screen, screen.copy(), region_around(0, 0, CHECKPOINT_REGION_SIZE))[0]
+
+def test_default_tolerance_shrinks_with_area():
+    assert default_max_distance(1920, 1080) < default_max_distance(CHECKPOINT_REGION_SIZE, CHECKPOINT_REGION_SIZE)
+    assert default_max_distance(1, 1) >= 1
\ No newline at end of file
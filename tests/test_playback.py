@@ -0,0 +1,125 @@
+"""
+Timing tests for script playback, run headless against NullInput and a synthetic screen.
+"""
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from autoclick.core import frame_cache
+from autoclick.core.capture import SyntheticCapture
+from autoclick.core.frame_cache import FrameProvider
+from autoclick.core.input_backends import NullInput
+from autoclick.core.playback import PlaybackThread
+
+STOP_BOUND = 0.05  # Seconds stop() may take to end playback
+TIMING_TOLERANCE = 0.05  # Seconds an action may drift from its expected release time
+
+@pytest.fixture(autouse=True)
+def synthetic_screen(monkeypatch):
+    provider = FrameProvider(backend=SyntheticCapture([np.zeros((120, 160, 3), np.uint8)]))
+    monkeypatch.setattr(frame_cache, '_frame_provider', provider)
+    return provider
+
+def start_playback(actions, **kwargs):
+    """Run a PlaybackThread's run() on a plain thread; returns (playback, thread, input)."""
+    backend = NullInput()
+    playback = PlaybackThread(actions, input_backend=backend, **kwargs)
+    thread = threading.Thread(target=playback.run, daemon=True)
+    thread.start()
+    return playback, thread, backend
+
+def wait_for_events(backend, count, timeout=2.0):
+    """Wait until backend has recorded count calls and return the ns time of the last one."""
+    deadline = time.monotonic() + timeout
+    while len(backend.events) < count:
+        assert time.monotonic() < deadline, f"only {len(backend.events)} of {count} actions played"
+        time.sleep(0.001)
+    return backend.events[count - 1][0]
+
+def stop_and_time(playback, thread):
+    start = time.perf_counter()
+    playback.stop()
+    thread.join(1.0)
+    elapsed = time.perf_counter() - start
+    assert not thread.is_alive()
+    return elapsed
+
+def test_stop_ends_long_idle_promptly():
+    actions = [{'type': 'move', 'x': 1, 'y': 1, 'time': 0.0},
+               {'type': 'move', 'x': 2, 'y': 2, 'time': 60.0}]
+    playback, thread, backend = start_playback(actions)
+    wait_for_events(backend, 1)
+    time.sleep(0.1)
+    
+    assert stop_and_time(playback, thread) < STOP_BOUND
+    assert playback.stop_latency < STOP_BOUND
+    assert len(backend.events) == 1
+
+def test_stop_ends_stability_wait_promptly():
+    # A static screen only counts as stable after a minute, so the wait blocks until stopped
+    actions = [{'type': 'move', 'x': 1, 'y': 1, 'time': 0.0},
+               {'type': 'wait_stable', 'time': 0.0, 'stable_ms': 60000, 'timeout': 60.0},
+               {'type': 'move', 'x': 2, 'y': 2, 'time': 0.0}]
+    playback, thread, backend = start_playback(actions)
+    wait_for_events(backend, 1)
+    time.sleep(0.1)
+    
+    assert stop_and_time(playback, thread) < STOP_BOUND
+    assert playback.stop_latency < STOP_BOUND
+    assert len(backend.events) == 1
+
+def test_pause_holds_and_resume_keeps_remaining_gap():
+    actions = [{'type': 'move', 'x': 1, 'y': 1, 'time': 0.0},
+               {'type': 'move', 'x': 2, 'y': 2, 'time': 0.2}]
+    playback, thread, backend = start_playback(actions)
+    first = wait_for_events(backend, 1)
+    time.sleep(0.05)
+    
+    paused_at = time.perf_counter_ns()
+    playback.pause()
+    time.sleep(0.5)
+    assert len(backend.events) == 1
+    playback.resume()
+    paused_ns = time.perf_counter_ns() - paused_at
+    
+    second = wait_for_events(backend, 2)
+    thread.join(1.0)
+    # The pause pushes the second action back by exactly its length, without catching up
+    assert abs((second - first - paused_ns) / 1e9 - 0.2) < TIMING_TOLERANCE
+
+def test_set_speed_scales_only_the_remaining_gap():
+    actions = [{'type': 'move', 'x': 1, 'y': 1, 'time': 0.0},
+               {'type': 'move', 'x': 2, 'y': 2, 'time': 2.0}]
+    playback, thread, backend = start_playback(actions)
+    first = wait_for_events(backend, 1)
+    time.sleep(0.5)
+    
+    changed_at = time.perf_counter_ns()
+    playback.set_speed(4.0)
+    
+    second = wait_for_events(backend, 2)
+    thread.join(1.0)
+    played = (changed_at - first) / 1e9
+    # Script time already played counts at 1x, the rest at 4x
+    assert abs((second - changed_at) / 1e9 - (2.0 - played) / 4.0) < TIMING_TOLERANCE
+
+def test_set_speed_during_pause_applies_after_resume():
+    actions = [{'type': 'move', 'x': 1, 'y': 1, 'time': 0.0},
+               {'type': 'move', 'x': 2, 'y': 2, 'time': 1.0}]
+    playback, thread, backend = start_playback(actions)
+    first = wait_for_events(backend, 1)
+    
+    playback.pause()
+    paused_at = time.perf_counter_ns()
+    playback.set_speed(10.0)
+    time.sleep(0.3)
+    assert len(backend.events) == 1
+    resumed_at = time.perf_counter_ns()
+    playback.resume()
+    
+    second = wait_for_events(backend, 2)
+    thread.join(1.0)
+    played = (paused_at - first) / 1e9
+    assert abs((second - resumed_at) / 1e9 - (1.0 - played) / 10.0) < TIMING_TOLERANCE
\ No newline at end of file